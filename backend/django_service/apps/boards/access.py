@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from jose import jwt
+
+from .models import Board
+
+GRANT_TYPE = 'board_access'
+REVOKED_TYPE = 'board_access.revoked'
+
+
+def issue_board_grant(user, board: Board, role: str) -> dict:
+    """A short-lived signed grant letting ``user`` work on ``board`` in the FastAPI service."""
+    now = time.time()
+    lifetime = settings.BOARD_ACCESS_GRANT_LIFETIME
+    claims = {
+        'typ': GRANT_TYPE,
+        'user_id': user.id,
+        'board_id': board.id,
+        'workspace_id': board.workspace_id,
+        'role': role,
+        'iat': now,
+        'exp': int(now) + lifetime,
+    }
+    return {
+        'grant': jwt.encode(claims, settings.SIMPLE_JWT['SIGNING_KEY'], algorithm=settings.SIMPLE_JWT['ALGORITHM']),
+        'expires_in': lifetime,
+        'board_id': board.id,
+        'workspace_id': board.workspace_id,
+        'role': role,
+    }
+
+
+def revoke_board_access(user_id: int | None = None, workspace_id: int | None = None, board_id: int | None = None):
+    """Void grants issued so far for the given scope once the current transaction commits.
+
+    Revocations reach the FastAPI replicas over Postgres NOTIFY; elsewhere
+    grants simply run out.
+    """
+    def notify():
+        if connection.vendor != 'postgresql':
+            return
+        message = json.dumps({
+            'type': REVOKED_TYPE,
+            'user_id': user_id,
+            'workspace_id': workspace_id,
+            'board_id': board_id,
+            'at': time.time(),
+        })
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [settings.BOARD_ACCESS_CONTROL_CHANNEL, message])
+
+    transaction.on_commit(notify)
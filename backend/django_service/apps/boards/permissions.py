@@ -2,12 +2,9 @@ from __future__ import annotations
 
 from rest_framework import permissions
 
-from apps.workspaces.models import WorkspaceMember
+from apps.workspaces.membership import is_workspace_member
 
 
 class IsBoardWorkspaceMember(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        return WorkspaceMember.objects.filter(
-            workspace=obj.workspace,
-            user=request.user
-        ).exists()
+        return is_workspace_member(request, obj.workspace_id)
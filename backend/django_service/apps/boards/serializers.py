@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from rest_framework import serializers
 
-from apps.workspaces.models import WorkspaceMember
+from apps.workspaces.membership import is_workspace_member
 from .models import Board
 
 
@@ -15,7 +15,6 @@ class BoardSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at', 'updated_at')
 
     def validate_workspace(self, value):
-        user = self.context['request'].user
-        if not WorkspaceMember.objects.filter(workspace=value, user=user).exists():
+        if not is_workspace_member(self.context['request'], value):
             raise serializers.ValidationError('You are not a member of this workspace.')
         return value
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from django.urls import path
 
-from .views import BoardDetailView
+from .views import BoardAccessView, BoardDetailView
 
 urlpatterns = [
     path('<int:pk>/', BoardDetailView.as_view(), name='board_detail'),
+    path('<int:pk>/access/', BoardAccessView.as_view(), name='board_access'),
 ]
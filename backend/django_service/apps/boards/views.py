@@ -3,8 +3,11 @@ from __future__ import annotations
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from apps.workspaces.models import Workspace, WorkspaceMember
+from apps.workspaces.membership import is_workspace_member, workspace_role
+from apps.workspaces.models import Workspace
+from .access import issue_board_grant, revoke_board_access
 from .models import Board
 from .permissions import IsBoardWorkspaceMember
 from .serializers import BoardSerializer
@@ -21,10 +24,10 @@ class BoardListView(generics.ListAPIView):
         except Workspace.DoesNotExist:
             return Board.objects.none()
 
-        if not WorkspaceMember.objects.filter(workspace=workspace, user=self.request.user).exists():
+        if not is_workspace_member(self.request, workspace):
             return Board.objects.none()
 
-        return Board.objects.filter(workspace=workspace)
+        return Board.objects.filter(workspace=workspace).select_related('workspace')
 
 
 class BoardCreateView(generics.CreateAPIView):
@@ -41,7 +44,7 @@ class BoardCreateView(generics.CreateAPIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        if not WorkspaceMember.objects.filter(workspace=workspace, user=request.user).exists():
+        if not is_workspace_member(request, workspace):
             return Response(
                 {'error': 'You are not a member of this workspace'},
                 status=status.HTTP_403_FORBIDDEN
@@ -54,6 +57,39 @@ class BoardCreateView(generics.CreateAPIView):
 
 
 class BoardDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Board.objects.all()
+    queryset = Board.objects.select_related('workspace')
     serializer_class = BoardSerializer
     permission_classes = (IsAuthenticated, IsBoardWorkspaceMember)
+
+    def perform_update(self, serializer):
+        workspace_id = serializer.instance.workspace_id
+        board = serializer.save()
+        if board.workspace_id != workspace_id:
+            revoke_board_access(board_id=board.id)
+
+    def perform_destroy(self, instance):
+        board_id = instance.id
+        instance.delete()
+        revoke_board_access(board_id=board_id)
+
+
+class BoardAccessView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, pk) -> Response:
+        try:
+            board = Board.objects.get(pk=pk)
+        except Board.DoesNotExist:
+            return Response(
+                {'error': 'Board not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        role = workspace_role(request, board.workspace_id)
+        if role is None:
+            return Response(
+                {'error': 'You are not a member of this workspace'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        return Response(issue_board_grant(request.user, board, role))
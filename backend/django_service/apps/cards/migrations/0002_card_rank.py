@@ -0,0 +1,52 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:38
+
+from django.db import migrations, models
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def spread(count):
+    width = 1
+    while len(DIGITS) ** width < (count + 1) * len(DIGITS):
+        width += 1
+    step = len(DIGITS) ** width // (count + 1)
+    ranks = []
+    for index in range(1, count + 1):
+        value = step * index
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, len(DIGITS))
+            digits.append(DIGITS[digit])
+        ranks.append(''.join(reversed(digits)).rstrip('0'))
+    return ranks
+
+
+def rank_existing_cards(apps, schema_editor):
+    Card = apps.get_model('cards', 'Card')
+    columns = {}
+    for card in Card.objects.order_by('board_id', 'column', 'position', 'id').only('id', 'board_id', 'column'):
+        columns.setdefault((card.board_id, card.column), []).append(card)
+    for cards in columns.values():
+        for card, rank in zip(cards, spread(len(cards))):
+            card.rank = rank
+        Card.objects.bulk_update(cards, ['rank'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cards', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='card',
+            name='rank',
+            field=models.CharField(default='', max_length=255),
+        ),
+        migrations.RunPython(rank_existing_cards, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['board_id', 'column', 'rank'], name='cards_card_board_col_rank'),
+        ),
+    ]
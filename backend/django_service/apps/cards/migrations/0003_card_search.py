@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:57
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cards', '0002_card_rank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='card',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector('description', config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='cards_card_search'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import models
+
+
+# Cards are read and written by the FastAPI service; these models own the schema.
+class Card(models.Model):
+    board_id = models.IntegerField(db_index=True)
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True, null=True)
+    position = models.IntegerField(default=0)
+    column = models.CharField(max_length=50, default='todo')
+    # Lexicographic order key within the column, see fastapi_service/app/ranking.py.
+    rank = models.CharField(max_length=255, default='')
+    created_by = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by Postgres for card search; titles outweigh descriptions.
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', config='simple', weight='A')
+            + SearchVector('description', config='simple', weight='B')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['board_id', 'column', 'rank'], name='cards_card_board_col_rank'),
+            GinIndex(fields=['search_vector'], name='cards_card_search'),
+        ]
+
+    def __str__(self) -> str:
+        return self.title
+
+
+class CardAssignment(models.Model):
+    card = models.ForeignKey(Card, on_delete=models.CASCADE, related_name='assignments')
+    user_id = models.IntegerField()
+    assigned_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f'{self.user_id} on {self.card_id}'
@@ -1,8 +1,28 @@
 from __future__ import annotations
 
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Backends whose entries live in one worker process only.
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
 
 
 class WorkspacesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.workspaces'
+
+    def ready(self):
+        if not settings.MEMBERSHIP_CACHE_TTL:
+            return
+        alias = settings.MEMBERSHIP_CACHE_ALIAS
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend is None or backend in PER_PROCESS_CACHES:
+            raise ImproperlyConfigured(
+                f'MEMBERSHIP_CACHE_TTL needs MEMBERSHIP_CACHE_ALIAS ({alias!r}) to name a cache shared by all '
+                'workers, such as Redis via MEMBERSHIP_CACHE_URL; otherwise removed members keep access in '
+                'other workers until the TTL runs out.'
+            )
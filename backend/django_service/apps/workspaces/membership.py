@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Workspace, WorkspaceMember
+
+ADMIN_ROLES = ('owner', 'admin')
+
+
+def _cache_key(user_id: int) -> str:
+    return f'workspace_roles:{user_id}'
+
+
+def _load_roles(user_id: int) -> dict[int, str]:
+    ttl = settings.MEMBERSHIP_CACHE_TTL
+    if ttl:
+        roles = caches[settings.MEMBERSHIP_CACHE_ALIAS].get(_cache_key(user_id))
+        if roles is not None:
+            return roles
+    roles = dict(WorkspaceMember.objects.filter(user_id=user_id).values_list('workspace_id', 'role'))
+    if ttl:
+        caches[settings.MEMBERSHIP_CACHE_ALIAS].set(_cache_key(user_id), roles, ttl)
+    return roles
+
+
+def workspace_roles(request) -> dict[int, str]:
+    """The requesting user's role in each of their workspaces, loaded once per request."""
+    http_request = getattr(request, '_request', request)
+    roles = getattr(http_request, '_workspace_roles', None)
+    if roles is None:
+        roles = _load_roles(request.user.id)
+        http_request._workspace_roles = roles
+    return roles
+
+
+def _workspace_id(workspace: Workspace | int) -> int:
+    return workspace.pk if isinstance(workspace, Workspace) else int(workspace)
+
+
+def workspace_role(request, workspace: Workspace | int) -> str | None:
+    return workspace_roles(request).get(_workspace_id(workspace))
+
+
+def is_workspace_member(request, workspace: Workspace | int) -> bool:
+    return workspace_role(request, workspace) is not None
+
+
+def is_workspace_admin(request, workspace: Workspace | int) -> bool:
+    return workspace_role(request, workspace) in ADMIN_ROLES
+
+
+def invalidate_workspace_roles(*user_ids: int):
+    if settings.MEMBERSHIP_CACHE_TTL:
+        caches[settings.MEMBERSHIP_CACHE_ALIAS].delete_many([_cache_key(user_id) for user_id in user_ids])
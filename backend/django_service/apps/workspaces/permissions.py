@@ -2,21 +2,14 @@ from __future__ import annotations
 
 from rest_framework import permissions
 
-from .models import WorkspaceMember
+from .membership import is_workspace_admin, is_workspace_member
 
 
 class IsWorkspaceMember(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        return WorkspaceMember.objects.filter(
-            workspace=obj,
-            user=request.user
-        ).exists()
+        return is_workspace_member(request, obj)
 
 
 class IsWorkspaceOwnerOrAdmin(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        return WorkspaceMember.objects.filter(
-            workspace=obj,
-            user=request.user,
-            role__in=['owner', 'admin']
-        ).exists()
+        return is_workspace_admin(request, obj)
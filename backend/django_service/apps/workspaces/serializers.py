@@ -4,6 +4,7 @@ from django.contrib.auth.models import User
 from rest_framework import serializers
 
 from apps.authentication.serializers import UserSerializer
+from .membership import invalidate_workspace_roles
 from .models import Workspace, WorkspaceMember
 
 
@@ -27,15 +28,27 @@ class WorkspaceSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'owner', 'created_at', 'updated_at')
 
     def get_member_count(self, obj: Workspace) -> int:
-        return obj.members.count()
+        member_count = getattr(obj, 'member_count', None)
+        return obj.members.count() if member_count is None else member_count
 
     def create(self, validated_data: dict) -> Workspace:
         user = self.context['request'].user
         workspace = Workspace.objects.create(owner=user, **validated_data)
         WorkspaceMember.objects.create(workspace=workspace, user=user, role='owner')
+        invalidate_workspace_roles(user.id)
         return workspace
 
 
+class WorkspaceListSerializer(serializers.ModelSerializer):
+    owner = UserSerializer(read_only=True)
+    member_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Workspace
+        fields = ('id', 'name', 'description', 'owner', 'member_count', 'created_at', 'updated_at')
+        read_only_fields = fields
+
+
 class AddMemberSerializer(serializers.Serializer):
     user_id = serializers.IntegerField()
     role = serializers.ChoiceField(choices=['admin', 'member'], default='member')
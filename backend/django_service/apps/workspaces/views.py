@@ -1,28 +1,52 @@
 from __future__ import annotations
 
 from django.contrib.auth.models import User
+from django.db.models import Count, Prefetch
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.boards.access import revoke_board_access
+from .membership import invalidate_workspace_roles
 from .models import Workspace, WorkspaceMember
 from .permissions import IsWorkspaceMember, IsWorkspaceOwnerOrAdmin
-from .serializers import AddMemberSerializer, WorkspaceSerializer
+from .serializers import AddMemberSerializer, WorkspaceListSerializer, WorkspaceSerializer
+
+
+def _workspaces(with_members: bool = True):
+    queryset = (
+        Workspace.objects.select_related('owner')
+        .annotate(member_count=Count('members'))
+        .order_by('-created_at')
+    )
+    if with_members:
+        queryset = queryset.prefetch_related(
+            Prefetch('members', queryset=WorkspaceMember.objects.select_related('user'))
+        )
+    return queryset
 
 
 class WorkspaceListCreateView(generics.ListCreateAPIView):
     serializer_class = WorkspaceSerializer
     permission_classes = (IsAuthenticated,)
 
+    def is_compact(self) -> bool:
+        return self.request.query_params.get('compact', '').lower() in ('1', 'true', 'yes')
+
+    def get_serializer_class(self):
+        if self.request.method == 'GET' and self.is_compact():
+            return WorkspaceListSerializer
+        return WorkspaceSerializer
+
     def get_queryset(self):
-        return Workspace.objects.filter(
-            members__user=self.request.user
-        ).distinct()
+        # A subquery rather than a join keeps member_count counting every member.
+        memberships = WorkspaceMember.objects.filter(user=self.request.user).values('workspace_id')
+        return _workspaces(with_members=not self.is_compact()).filter(id__in=memberships)
 
 
 class WorkspaceDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Workspace.objects.all()
+    queryset = _workspaces()
     serializer_class = WorkspaceSerializer
     permission_classes = (IsAuthenticated, IsWorkspaceMember)
 
@@ -44,7 +68,11 @@ class WorkspaceDetailView(generics.RetrieveUpdateDestroyAPIView):
                 {'error': 'Only workspace owner or admin can delete workspace'},
                 status=status.HTTP_403_FORBIDDEN
             )
+        workspace_id = instance.id
+        member_ids = list(instance.members.values_list('user_id', flat=True))
         instance.delete()
+        invalidate_workspace_roles(*member_ids)
+        revoke_board_access(workspace_id=workspace_id)
 
 
 class AddWorkspaceMemberView(APIView):
@@ -83,6 +111,7 @@ class AddWorkspaceMemberView(APIView):
             user=user,
             role=role
         )
+        invalidate_workspace_roles(user.id)
 
         return Response(
             {'message': 'Member added successfully', 'member_id': member.id},
@@ -116,6 +145,8 @@ class RemoveWorkspaceMemberView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             member.delete()
+            invalidate_workspace_roles(member.user_id)
+            revoke_board_access(user_id=member.user_id, workspace_id=workspace.id)
             return Response(
                 {'message': 'Member removed successfully'},
                 status=status.HTTP_204_NO_CONTENT
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class HybridPagination(BasePagination):
+    """Page numbers by default; cursor pages once a client sends ``cursor``.
+
+    Cursor pages are ordered by ``(created_at, id)`` and skip the count.
+    DRF seeks on ``created_at`` alone and offsets past rows that share the
+    boundary timestamp, so a page costs about the same at any depth unless
+    many rows were created in the same microsecond. Clients opt in by
+    requesting ``?cursor=`` and then following ``next``.
+    """
+
+    def __init__(self):
+        self.page_number = PageNumberPagination()
+        self.cursor = CreatedAtCursorPagination()
+        self.active: BasePagination = self.page_number
+
+    def paginate_queryset(self, queryset, request, view=None):
+        use_cursor = self.cursor.cursor_query_param in request.query_params
+        self.active = self.cursor if use_cursor else self.page_number
+        return self.active.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.page_number.get_schema_operation_parameters(view)
+            + self.cursor.get_schema_operation_parameters(view)
+        )
@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     'apps.authentication',
     'apps.workspaces',
     'apps.boards',
+    'apps.cards',
 ]
 
 MIDDLEWARE = [
@@ -105,7 +106,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'config.pagination.HybridPagination',
     'PAGE_SIZE': 100,
 }
 
@@ -125,3 +126,25 @@ CORS_ALLOWED_ORIGINS = os.getenv(
 ).split(',')
 
 CORS_ALLOW_CREDENTIALS = True
+
+# Seconds a user's workspace roles stay cached between requests; 0 disables it.
+MEMBERSHIP_CACHE_TTL = int(os.getenv('MEMBERSHIP_CACHE_TTL', '0'))
+# Cache alias holding them. It must be shared by every worker: membership
+# changes only clear the cache they can reach, so a per-process cache would
+# leave removed members with access in the other workers until the TTL ends.
+MEMBERSHIP_CACHE_ALIAS = os.getenv('MEMBERSHIP_CACHE_ALIAS', 'membership')
+MEMBERSHIP_CACHE_URL = os.getenv('MEMBERSHIP_CACHE_URL')
+
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+if MEMBERSHIP_CACHE_URL:
+    CACHES['membership'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': MEMBERSHIP_CACHE_URL,
+    }
+
+# Seconds a board-access grant issued to the FastAPI service stays valid.
+BOARD_ACCESS_GRANT_LIFETIME = int(os.getenv('BOARD_ACCESS_GRANT_LIFETIME', '300'))
+# Postgres NOTIFY channel the FastAPI replicas listen on for revocations.
+BOARD_ACCESS_CONTROL_CHANNEL = os.getenv('BROADCAST_CONTROL_CHANNEL', 'board_control')
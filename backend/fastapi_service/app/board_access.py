@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import itertools
+import os
+import time
+from collections import OrderedDict
+from typing import Any
+
+from jose import JWTError, jwt
+
+from app.connections import manager
+
+JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key-here')
+JWT_ALGORITHM = 'HS256'
+BOARD_ACCESS_REQUIRED = os.getenv('BOARD_ACCESS_REQUIRED', 'false').lower() in ('1', 'true', 'yes')
+BOARD_ACCESS_CACHE_SIZE = int(os.getenv('BOARD_ACCESS_CACHE_SIZE', '10000'))
+# Revocations are remembered this long, so it must cover the longest grant Django issues.
+BOARD_ACCESS_REVOCATION_TTL = float(os.getenv('BOARD_ACCESS_REVOCATION_TTL', '3600'))
+
+GRANT_TYPE = 'board_access'
+REVOKED_TYPE = 'board_access.revoked'
+
+# Application close code for sockets whose board access was revoked.
+ACCESS_REVOKED_CLOSE_CODE = 4003
+ACCESS_REVOKED_CLOSE_REASON = 'access_revoked'
+
+SCOPE_FIELDS = ('user_id', 'workspace_id', 'board_id')
+
+
+class BoardGrant:
+    __slots__ = ('user_id', 'workspace_id', 'board_id', 'role', 'issued_at', 'expires_at')
+
+    def __init__(self, claims: dict[str, Any]):
+        self.user_id = int(claims['user_id'])
+        self.workspace_id = int(claims['workspace_id'])
+        self.board_id = int(claims['board_id'])
+        self.role = claims.get('role')
+        self.issued_at = float(claims['iat'])
+        self.expires_at = float(claims['exp'])
+
+    def scope(self) -> tuple[int, int, int]:
+        return self.user_id, self.workspace_id, self.board_id
+
+
+class BoardAccess:
+    """Verifies the board-access grants Django signs, without touching the database.
+
+    A grant is a short-lived JWT naming one user, board and workspace.
+    Verified grants are cached by token. Revocations name any of a user,
+    workspace and board, and void every grant for that scope issued before
+    the revocation.
+    """
+
+    def __init__(
+        self,
+        secret: str = JWT_SECRET_KEY,
+        required: bool = BOARD_ACCESS_REQUIRED,
+        cache_size: int = BOARD_ACCESS_CACHE_SIZE,
+        revocation_ttl: float = BOARD_ACCESS_REVOCATION_TTL,
+    ):
+        self.secret = secret
+        self.required = required
+        self.cache_size = cache_size
+        self.revocation_ttl = revocation_ttl
+        self.hits = 0
+        self.misses = 0
+        self.denied = 0
+        self.revocations = 0
+        self.sockets_closed = 0
+        self._grants: OrderedDict[str, BoardGrant] = OrderedDict()
+        self._revoked: dict[tuple[int | None, int | None, int | None], float] = {}
+
+    def _decode(self, token: str) -> BoardGrant | None:
+        grant = self._grants.get(token)
+        if grant is not None:
+            self.hits += 1
+            self._grants.move_to_end(token)
+            return grant
+
+        self.misses += 1
+        try:
+            claims = jwt.decode(token, self.secret, algorithms=[JWT_ALGORITHM])
+            if claims.get('typ') != GRANT_TYPE:
+                return None
+            grant = BoardGrant(claims)
+        except (JWTError, KeyError, TypeError, ValueError):
+            return None
+        self._grants[token] = grant
+        if len(self._grants) > self.cache_size:
+            self._grants.popitem(last=False)
+        return grant
+
+    def verify(self, token: str, user_id: int, board_id: int | None = None) -> BoardGrant | None:
+        """The grant ``token`` carries if it is live and issued to ``user_id`` for ``board_id``."""
+        grant = self._decode(token)
+        if grant is not None and grant.expires_at <= time.time():
+            self._grants.pop(token, None)
+            grant = None
+        if (
+            grant is None
+            or grant.user_id != user_id
+            or (board_id is not None and grant.board_id != board_id)
+            or self.is_revoked(grant)
+        ):
+            self.denied += 1
+            return None
+        return grant
+
+    def is_revoked(self, grant: BoardGrant) -> bool:
+        if not self._revoked:
+            return False
+        values = grant.scope()
+        for mask in itertools.product((True, False), repeat=len(values)):
+            key = tuple(value if keep else None for value, keep in zip(values, mask))
+            revoked_at = self._revoked.get(key)
+            if revoked_at is not None and grant.issued_at <= revoked_at:
+                return True
+        return False
+
+    def revoke(
+        self,
+        user_id: int | None = None,
+        workspace_id: int | None = None,
+        board_id: int | None = None,
+        at: float | None = None,
+    ) -> tuple[int | None, int | None, int | None]:
+        key = (user_id, workspace_id, board_id)
+        if key == (None, None, None):
+            raise ValueError('A revocation needs a user, workspace or board')
+        now = time.time()
+        at = now if at is None else at
+        self._revoked[key] = max(at, self._revoked.get(key, at))
+        self.revocations += 1
+        cutoff = now - self.revocation_ttl
+        for stale in [key for key, revoked_at in self._revoked.items() if revoked_at < cutoff]:
+            del self._revoked[stale]
+        return key
+
+    async def on_control(self, message: dict[str, Any]):
+        if message.get('type') != REVOKED_TYPE:
+            return
+        scope = {name: message.get(name) for name in SCOPE_FIELDS}
+        self.revoke(**scope, at=message.get('at'))
+        closed = await manager.close_connections(
+            lambda connection: connection.grant is not None and self.is_revoked(connection.grant),
+            ACCESS_REVOKED_CLOSE_CODE,
+            ACCESS_REVOKED_CLOSE_REASON,
+            # Earlier revocations already closed their sockets; only this scope can match.
+            user_id=scope['user_id'],
+            board_id=scope['board_id'],
+        )
+        self.sockets_closed += closed
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'required': self.required,
+            'cached_grants': len(self._grants),
+            'hits': self.hits,
+            'misses': self.misses,
+            'denied': self.denied,
+            'revocations': self.revocations,
+            'active_revocations': len(self._revoked),
+            'sockets_closed': self.sockets_closed,
+        }
+
+
+board_access = BoardAccess()
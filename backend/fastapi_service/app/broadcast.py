@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy.engine import make_url
+
+from app.database import DATABASE_URL
+from app.encoding import Frame, decode, encode
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_BACKEND = os.getenv('BROADCAST_BACKEND', 'memory')
+BROADCAST_CHANNEL = os.getenv('BROADCAST_CHANNEL', 'board_events')
+BROADCAST_CONTROL_CHANNEL = os.getenv('BROADCAST_CONTROL_CHANNEL', 'board_control')
+BROADCAST_SEQUENCE = os.getenv('BROADCAST_SEQUENCE', 'board_event_seq')
+BROADCAST_PAYLOAD_TABLE = os.getenv('BROADCAST_PAYLOAD_TABLE', 'board_event_payload')
+BROADCAST_PAYLOAD_RETENTION = int(os.getenv('BROADCAST_PAYLOAD_RETENTION', '300'))
+BROADCAST_RECONNECT_DELAY = float(os.getenv('BROADCAST_RECONNECT_DELAY', '2'))
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more.
+NOTIFY_PAYLOAD_LIMIT = 7999
+
+Handler = Callable[[int, dict[str, Any]], Awaitable[None]]
+ResetListener = Callable[[int], None]
+ControlHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+class BroadcastBackend:
+    """Carries board events between replicas.
+
+    Every replica publishes each event exactly once and every subscribed
+    handler, including the publisher's own, receives it for local delivery.
+    Each event is stamped with a sequence number that increases across all
+    boards; every event numbered above ``floor_seq`` reaches this replica.
+
+    Control messages, such as access revocations from the Django service,
+    are unnumbered and not tied to a board.
+    """
+
+    def __init__(self):
+        self._handlers: list[Handler] = []
+        self._control_handlers: list[ControlHandler] = []
+        self._reset_listeners: list[ResetListener] = []
+        self.floor_seq = 0
+
+    def subscribe(self, handler: Handler):
+        self._handlers.append(handler)
+
+    def subscribe_control(self, handler: ControlHandler):
+        self._control_handlers.append(handler)
+
+    def on_reset(self, listener: ResetListener):
+        self._reset_listeners.append(listener)
+
+    def _reset(self, floor_seq: int):
+        self.floor_seq = floor_seq
+        for listener in self._reset_listeners:
+            listener(floor_seq)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, board_id: int, envelope: dict[str, Any]):
+        raise NotImplementedError
+
+    async def _dispatch(self, board_id: int, envelope: dict[str, Any]):
+        envelope['message']['seq'] = envelope['seq']
+        envelope['frame'] = Frame(envelope['message'])
+        for handler in self._handlers:
+            try:
+                await handler(board_id, envelope)
+            except Exception:
+                logger.exception('Broadcast handler failed for board %s', board_id)
+
+    async def _dispatch_control(self, message: dict[str, Any]):
+        for handler in self._control_handlers:
+            try:
+                await handler(message)
+            except Exception:
+                logger.exception('Control handler failed for %s', message.get('type'))
+
+
+class MemoryBroadcast(BroadcastBackend):
+    """In-process hub.
+
+    Sufficient for a single replica, and lets several managers in one
+    process stand in for separate replicas in tests.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # Seeded from the clock so sequence numbers keep rising across restarts.
+        self.floor_seq = time.time_ns() // 1000
+        self._seq = itertools.count(self.floor_seq + 1)
+
+    async def publish(self, board_id: int, envelope: dict[str, Any]):
+        envelope['seq'] = next(self._seq)
+        await self._dispatch(board_id, envelope)
+
+
+class PostgresBroadcast(BroadcastBackend):
+    """Fans events out through Postgres LISTEN/NOTIFY."""
+
+    def __init__(self, dsn: str, channel: str, sequence: str, payload_table: str, control_channel: str):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self.control_channel = control_channel
+        self.sequence = sequence
+        self.payload_table = payload_table
+        self._listen_conn = None
+        self._publish_conn = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._inbox: asyncio.Queue | None = None
+        self._consumer: asyncio.Task | None = None
+        self._reconnect: asyncio.Task | None = None
+        self._republish: asyncio.Task | None = None
+        self._stopping = False
+        # Highest sequence number dispatched from the listener.
+        self._last_seq = 0
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        return conn
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._inbox = asyncio.Queue()
+        self._stopping = False
+        self._publish_conn = await self._loop.run_in_executor(None, self._connect)
+        await self._loop.run_in_executor(None, self._create_schema)
+        await self._listen()
+        self._consumer = asyncio.create_task(self._consume())
+
+    def _create_schema(self):
+        with self._publish_conn.cursor() as cursor:
+            cursor.execute(sql.SQL('CREATE SEQUENCE IF NOT EXISTS {}').format(sql.Identifier(self.sequence)))
+            # Events too large for a NOTIFY payload are parked here and announced by number.
+            cursor.execute(
+                sql.SQL(
+                    'CREATE TABLE IF NOT EXISTS {} ('
+                    'seq bigint PRIMARY KEY, payload text NOT NULL, '
+                    'created_at timestamptz NOT NULL DEFAULT now())'
+                ).format(sql.Identifier(self.payload_table))
+            )
+
+    def _subscribe(self):
+        conn = self._connect()
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL('LISTEN {}').format(sql.Identifier(self.channel)))
+            cursor.execute(sql.SQL('LISTEN {}').format(sql.Identifier(self.control_channel)))
+            # Anything numbered after this point is published once we are listening.
+            cursor.execute(
+                sql.SQL('SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM {}')
+                .format(sql.Identifier(self.sequence))
+            )
+            floor_seq = cursor.fetchone()[0]
+        return conn, floor_seq
+
+    async def _listen(self):
+        self._listen_conn, floor_seq = await self._loop.run_in_executor(None, self._subscribe)
+        self._loop.add_reader(self._listen_conn.fileno(), self._on_readable)
+        self._last_seq = max(self._last_seq, floor_seq)
+        self._reset(floor_seq)
+
+    def _on_readable(self):
+        try:
+            self._listen_conn.poll()
+        except psycopg2.Error:
+            logger.exception('Lost broadcast listener connection')
+            self._drop_listener()
+            if not self._stopping and self._reconnect is None:
+                self._reconnect = asyncio.create_task(self._relisten())
+            return
+
+        while self._listen_conn.notifies:
+            notify = self._listen_conn.notifies.pop(0)
+            self._inbox.put_nowait((notify.channel, notify.payload))
+
+    def _drop_listener(self):
+        if self._listen_conn is None:
+            return
+        try:
+            self._loop.remove_reader(self._listen_conn.fileno())
+        except (ValueError, psycopg2.Error):
+            pass
+        try:
+            self._listen_conn.close()
+        except psycopg2.Error:
+            pass
+        self._listen_conn = None
+
+    async def _relisten(self):
+        try:
+            while not self._stopping:
+                await asyncio.sleep(BROADCAST_RECONNECT_DELAY)
+                try:
+                    await self._listen()
+                    logger.info('Broadcast listener reconnected')
+                    return
+                except psycopg2.Error:
+                    logger.warning('Broadcast listener reconnect failed, retrying')
+        finally:
+            self._reconnect = None
+
+    async def _consume(self):
+        while True:
+            channel, payload = await self._inbox.get()
+            try:
+                data = decode(payload)
+            except ValueError:
+                logger.warning('Discarding malformed broadcast payload')
+                continue
+            if channel == self.control_channel:
+                await self._dispatch_control(data)
+                continue
+            if data.get('stored'):
+                seq = data['seq']
+                try:
+                    stored = await self._loop.run_in_executor(None, self._load_payload, seq)
+                except psycopg2.Error:
+                    logger.exception('Failed to load stored broadcast %s', seq)
+                    continue
+                if stored is None:
+                    logger.warning('Stored broadcast %s has expired', seq)
+                    continue
+                data = decode(stored)
+                data['seq'] = seq
+            envelope = data['envelope']
+            envelope['seq'] = data['seq']
+            if data['seq'] <= self._last_seq:
+                # Publishers serialise on an advisory lock, so this should not happen;
+                # if it does, replay past this event cannot be trusted.
+                logger.warning('Broadcast %s arrived after %s, resetting the event log', data['seq'], self._last_seq)
+                self._reset(self._last_seq)
+            self._last_seq = max(self._last_seq, data['seq'])
+            await self._dispatch(data['board_id'], envelope)
+
+    def _load_payload(self, seq: int) -> str | None:
+        if self._publish_conn is None:
+            raise psycopg2.InterfaceError('Broadcast publish connection is down')
+        with self._publish_conn.cursor() as cursor:
+            cursor.execute(
+                sql.SQL('SELECT payload FROM {} WHERE seq = %s').format(sql.Identifier(self.payload_table)),
+                (seq,),
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    def _notify(self, tail: str):
+        # The sequence number is spliced into the payload server side so
+        # numbering and publishing take a single round trip. NOTIFYs go out in
+        # commit order, so publishers on every replica hold a transaction-level
+        # advisory lock from nextval to commit to keep that in sequence order.
+        with self._publish_conn.cursor() as cursor:
+            cursor.execute(
+                'BEGIN; SELECT pg_advisory_xact_lock(hashtext(%s)); '
+                'WITH s AS (SELECT nextval(%s) AS seq) '
+                "SELECT pg_notify(%s, '{\"seq\":' || s.seq || %s) FROM s; COMMIT",
+                (self.sequence, self.sequence, self.channel, tail),
+            )
+
+    def _notify_stored(self, payload: str):
+        table = sql.Identifier(self.payload_table)
+        with self._publish_conn.cursor() as cursor:
+            cursor.execute(
+                sql.SQL(
+                    'BEGIN; SELECT pg_advisory_xact_lock(hashtext(%s)); '
+                    'WITH s AS (INSERT INTO {} (seq, payload) VALUES (nextval(%s), %s) RETURNING seq) '
+                    "SELECT pg_notify(%s, '{{\"seq\":' || s.seq || ',\"stored\":true}}') FROM s; COMMIT"
+                ).format(table),
+                (self.sequence, self.sequence, payload, self.channel),
+            )
+            cursor.execute(
+                sql.SQL("DELETE FROM {} WHERE created_at < now() - %s * interval '1 second'").format(table),
+                (BROADCAST_PAYLOAD_RETENTION,),
+            )
+
+    async def publish(self, board_id: int, envelope: dict[str, Any]):
+        payload = encode({'board_id': board_id, 'envelope': envelope})
+        if len(payload.encode()) + 32 > NOTIFY_PAYLOAD_LIMIT:
+            send, arg = self._notify_stored, payload
+        else:
+            send, arg = self._notify, ',' + payload[1:]
+
+        if self._publish_conn is None:
+            logger.error('Dropped broadcast for board %s while the publish connection is down', board_id)
+            return
+        try:
+            await self._loop.run_in_executor(None, send, arg)
+            return
+        except psycopg2.Error:
+            logger.exception('Failed to publish broadcast for board %s, reconnecting', board_id)
+            self._drop_publisher()
+        # One immediate retry on a fresh connection; after that, reconnect in the background.
+        try:
+            self._publish_conn = await self._loop.run_in_executor(None, self._connect)
+            await self._loop.run_in_executor(None, send, arg)
+        except psycopg2.Error:
+            logger.exception('Dropped broadcast for board %s after retrying', board_id)
+            self._drop_publisher()
+            if not self._stopping and self._republish is None:
+                self._republish = asyncio.create_task(self._reconnect_publisher())
+
+    def _drop_publisher(self):
+        if self._publish_conn is None:
+            return
+        try:
+            self._publish_conn.close()
+        except psycopg2.Error:
+            pass
+        self._publish_conn = None
+
+    async def _reconnect_publisher(self):
+        try:
+            while not self._stopping:
+                await asyncio.sleep(BROADCAST_RECONNECT_DELAY)
+                try:
+                    self._publish_conn = await self._loop.run_in_executor(None, self._connect)
+                    logger.info('Broadcast publisher reconnected')
+                    return
+                except psycopg2.Error:
+                    logger.warning('Broadcast publisher reconnect failed, retrying')
+        finally:
+            self._republish = None
+
+    async def stop(self):
+        self._stopping = True
+        for task in (self._consumer, self._reconnect, self._republish):
+            if task is not None:
+                task.cancel()
+        self._drop_listener()
+        self._drop_publisher()
+
+
+def _libpq_dsn(url: str) -> str:
+    # DATABASE_URL is a SQLAlchemy URL; libpq does not know driver suffixes such as +psycopg2.
+    return make_url(url).set(drivername='postgresql').render_as_string(hide_password=False)
+
+
+def get_broadcast_backend() -> BroadcastBackend:
+    if BROADCAST_BACKEND == 'memory':
+        return MemoryBroadcast()
+    if BROADCAST_BACKEND == 'postgres':
+        return PostgresBroadcast(
+            _libpq_dsn(DATABASE_URL),
+            BROADCAST_CHANNEL,
+            BROADCAST_SEQUENCE,
+            BROADCAST_PAYLOAD_TABLE,
+            BROADCAST_CONTROL_CHANNEL,
+        )
+    raise ValueError(f'Unknown BROADCAST_BACKEND: {BROADCAST_BACKEND}')
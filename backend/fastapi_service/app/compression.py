@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import os
+import time
+import zlib
+from typing import Any, Sequence
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol
+from websockets.extensions.base import ExtensionParameter
+from websockets.extensions.permessage_deflate import PerMessageDeflate, ServerPerMessageDeflateFactory
+from websockets.frames import CTRL_OPCODES, OP_CONT, Frame
+
+WS_COMPRESSION = os.getenv('WS_COMPRESSION', 'true').lower() in ('1', 'true', 'yes')
+WS_COMPRESSION_LEVEL = int(os.getenv('WS_COMPRESSION_LEVEL', '6'))
+WS_COMPRESSION_MEM_LEVEL = int(os.getenv('WS_COMPRESSION_MEM_LEVEL', '8'))
+# The compressor keeps about 2**(window_bits + 2) + 2**(mem_level + 9) bytes per
+# connection while context takeover is on; smaller windows trade ratio for memory.
+WS_COMPRESSION_WINDOW_BITS = int(os.getenv('WS_COMPRESSION_WINDOW_BITS', '15'))
+WS_COMPRESSION_CONTEXT_TAKEOVER = os.getenv('WS_COMPRESSION_CONTEXT_TAKEOVER', 'true').lower() in ('1', 'true', 'yes')
+WS_COMPRESSION_MIN_SIZE = int(os.getenv('WS_COMPRESSION_MIN_SIZE', '1024'))
+
+HTTP_COMPRESSION_MIN_SIZE = int(os.getenv('HTTP_COMPRESSION_MIN_SIZE', '1024'))
+HTTP_COMPRESSION_GZIP_LEVEL = int(os.getenv('HTTP_COMPRESSION_GZIP_LEVEL', '6'))
+HTTP_COMPRESSION_BROTLI_QUALITY = int(os.getenv('HTTP_COMPRESSION_BROTLI_QUALITY', '4'))
+
+# Preferred first when a client accepts several.
+HTTP_ENCODINGS = ('br', 'gzip')
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+
+class CompressionStats:
+    __slots__ = ('compressed', 'skipped', 'bytes_in', 'bytes_out', 'seconds')
+
+    def __init__(self):
+        self.compressed = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    def record(self, bytes_in: int, bytes_out: int, seconds: float):
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.seconds += seconds
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'compressed': self.compressed,
+            'skipped': self.skipped,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'ratio': round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+            'seconds': round(self.seconds, 6),
+        }
+
+
+websocket_compression = CompressionStats()
+http_compression = {encoding: CompressionStats() for encoding in HTTP_ENCODINGS}
+
+
+def compression_stats() -> dict[str, Any]:
+    return {
+        'websocket': websocket_compression.stats(),
+        'http': {encoding: stats.stats() for encoding, stats in http_compression.items()},
+    }
+
+
+class ThresholdPerMessageDeflate(PerMessageDeflate):
+    """permessage-deflate that sends messages below ``min_size`` uncompressed.
+
+    RFC 7692 lets each message choose: only compressed ones set RSV1, and
+    skipped messages never enter either side's compression context.
+    """
+
+    def __init__(self, *args: Any, min_size: int = WS_COMPRESSION_MIN_SIZE, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.min_size = min_size
+        self.skipping = False
+
+    def encode(self, frame: Frame) -> Frame:
+        if frame.opcode in CTRL_OPCODES:
+            return frame
+        if frame.opcode is not OP_CONT:
+            self.skipping = frame.fin and len(frame.data) < self.min_size
+            if self.skipping:
+                websocket_compression.skipped += 1
+            else:
+                websocket_compression.compressed += 1
+        if self.skipping:
+            return frame
+
+        started = time.perf_counter()
+        encoded = super().encode(frame)
+        websocket_compression.record(len(frame.data), len(encoded.data), time.perf_counter() - started)
+        return encoded
+
+
+class ThresholdPerMessageDeflateFactory(ServerPerMessageDeflateFactory):
+    def __init__(self, *args: Any, min_size: int = WS_COMPRESSION_MIN_SIZE, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.min_size = min_size
+
+    def process_request_params(
+        self, params: Sequence[ExtensionParameter], accepted_extensions: Sequence[Any]
+    ) -> tuple[list[ExtensionParameter], PerMessageDeflate]:
+        response_params, negotiated = super().process_request_params(params, accepted_extensions)
+        return response_params, ThresholdPerMessageDeflate(
+            negotiated.remote_no_context_takeover,
+            negotiated.local_no_context_takeover,
+            negotiated.remote_max_window_bits,
+            negotiated.local_max_window_bits,
+            negotiated.compress_settings,
+            min_size=self.min_size,
+        )
+
+
+class CompressingWebSocketProtocol(WebSocketProtocol):
+    """uvicorn's websockets protocol with tunable, size-gated permessage-deflate.
+
+    Selected by serve.py; uvicorn's own factory has no settings.
+    """
+
+    def __init__(self, config: Any, *args: Any, **kwargs: Any):
+        super().__init__(config, *args, **kwargs)
+        self.available_extensions = []
+        if config.ws_per_message_deflate and WS_COMPRESSION:
+            self.available_extensions.append(ThresholdPerMessageDeflateFactory(
+                server_no_context_takeover=not WS_COMPRESSION_CONTEXT_TAKEOVER,
+                server_max_window_bits=WS_COMPRESSION_WINDOW_BITS,
+                compress_settings={'level': WS_COMPRESSION_LEVEL, 'memLevel': WS_COMPRESSION_MEM_LEVEL},
+            ))
+
+
+def _accepted_encoding(accept_encoding: str) -> str | None:
+    accepted = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        accepted[name.strip().lower()] = quality
+    for encoding in HTTP_ENCODINGS:
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+class _Compressor:
+    __slots__ = ('encoding', '_gzip', '_brotli')
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=HTTP_COMPRESSION_BROTLI_QUALITY)
+        else:
+            # wbits 16 + 15 writes a gzip header and trailer.
+            self._gzip = zlib.compressobj(HTTP_COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        started = time.perf_counter()
+        if self.encoding == 'br':
+            out = self._brotli.process(data) + (self._brotli.finish() if final else self._brotli.flush())
+        else:
+            out = self._gzip.compress(data) + self._gzip.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        http_compression[self.encoding].record(len(data), len(out), time.perf_counter() - started)
+        return out
+
+
+class CompressionMiddleware:
+    """gzip or brotli for responses under ``paths``, per Accept-Encoding.
+
+    Complete bodies smaller than ``minimum_size`` go out as they are.
+    Streamed bodies are compressed chunk by chunk, each chunk flushed so
+    clients can act on it right away.
+    """
+
+    def __init__(self, app: ASGIApp, paths: Sequence[str] = ('/api/',), minimum_size: int = HTTP_COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.paths = tuple(paths)
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or not scope['path'].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+        encoding = _accepted_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: _Compressor | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start, compressor, passthrough
+            if message['type'] == 'http.response.start':
+                start = message
+                return
+            if message['type'] != 'http.response.body' or passthrough:
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start['headers'])
+                content_type = headers.get('content-type', '')
+                if (
+                    start['status'] in (204, 304)
+                    or 'content-encoding' in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                elif not more_body and len(body) < self.minimum_size:
+                    http_compression[encoding].skipped += 1
+                    passthrough = True
+                if passthrough:
+                    await send(start)
+                    await send(message)
+                    return
+
+                http_compression[encoding].compressed += 1
+                compressor = _Compressor(encoding)
+                body = compressor.compress(body, final=not more_body)
+                headers['Content-Encoding'] = encoding
+                headers.add_vary_header('Accept-Encoding')
+                if more_body:
+                    if 'content-length' in headers:
+                        del headers['content-length']
+                else:
+                    headers['Content-Length'] = str(len(body))
+                await send(start)
+                await send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+                return
+
+            await send({
+                'type': 'http.response.body',
+                'body': compressor.compress(body, final=not more_body),
+                'more_body': more_body,
+            })
+
+        await self.app(scope, receive, send_compressed)
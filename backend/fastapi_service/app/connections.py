@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import os
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Collection, Iterator
+
+from fastapi import WebSocket
+
+from app.broadcast import BroadcastBackend, get_broadcast_backend
+from app.encoding import MSGPACK_SUBPROTOCOL, Frame
+
+OVERFLOW_DROP_OLDEST = 'drop_oldest'
+OVERFLOW_COALESCE = 'coalesce'
+OVERFLOW_DISCONNECT = 'disconnect'
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE, OVERFLOW_DISCONNECT)
+
+SEND_QUEUE_SIZE = int(os.getenv('WS_SEND_QUEUE_SIZE', '256'))
+# Only disconnect keeps clients consistent: seq is global across boards, so a client cannot see
+# that an event was dropped, and a since= reconnect cannot recover it.
+SEND_QUEUE_OVERFLOW = os.getenv('WS_SEND_QUEUE_OVERFLOW', OVERFLOW_DISCONNECT)
+
+# Application close code telling the client to reconnect and reload the board.
+RESYNC_CLOSE_CODE = 4000
+RESYNC_CLOSE_REASON = 'resync'
+
+COALESCABLE_TYPES = ('card.updated', 'card.moved', 'card.moving')
+
+if SEND_QUEUE_OVERFLOW not in OVERFLOW_POLICIES:
+    raise ValueError(f'Unknown WS_SEND_QUEUE_OVERFLOW: {SEND_QUEUE_OVERFLOW}')
+
+
+def _coalesce_key(frame: Frame) -> tuple[str, Any] | None:
+    message = frame.message
+    if message.get('type') not in COALESCABLE_TYPES:
+        return None
+    data = message.get('data')
+    if not isinstance(data, dict) or 'id' not in data:
+        return None
+    return message['type'], data['id']
+
+
+_connection_ids = itertools.count(1)
+
+
+class Connection:
+    __slots__ = (
+        'id', 'websocket', 'board_id', 'user_id', 'username', 'grant', 'binary', 'max_queue', 'overflow',
+        'queue', 'dropped', 'coalesced', 'resync_requested', 'closed', 'last_seen',
+        '_on_close', '_ready', '_writer',
+    )
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        board_id: int,
+        user_info: dict[str, Any],
+        on_close: Callable[[Connection], None],
+        grant: Any = None,
+        subprotocol: str | None = None,
+        max_queue: int = SEND_QUEUE_SIZE,
+        overflow: str = SEND_QUEUE_OVERFLOW,
+    ):
+        self.id = next(_connection_ids)
+        self.websocket = websocket
+        self.board_id = board_id
+        self.user_id = user_info['user_id']
+        self.username = user_info.get('username')
+        self.grant = grant
+        self.binary = subprotocol == MSGPACK_SUBPROTOCOL
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.queue: deque[Frame] = deque()
+        self.dropped = 0
+        self.coalesced = 0
+        self.resync_requested = False
+        self.closed = False
+        # Monotonic time of the last message from the client.
+        self.last_seen = time.monotonic()
+        self._on_close = on_close
+        self._ready = asyncio.Event()
+        self._writer: asyncio.Task | None = None
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def enqueue(self, frame: Frame):
+        if self.closed or self.resync_requested:
+            return
+
+        if len(self.queue) >= self.max_queue:
+            if self.overflow == OVERFLOW_DROP_OLDEST:
+                self.queue.popleft()
+                self.dropped += 1
+            elif not (self.overflow == OVERFLOW_COALESCE and self._coalesce(frame)):
+                # Also when coalescing found nothing to merge: dropping would leave the client silently diverged.
+                self.dropped += len(self.queue) + 1
+                self.resync_requested = True
+                asyncio.create_task(self._close_for_resync())
+                return
+
+        self.queue.append(frame)
+        self._ready.set()
+
+    def _coalesce(self, frame: Frame) -> bool:
+        key = _coalesce_key(frame)
+        if key is None:
+            return False
+        for index, pending in enumerate(self.queue):
+            if _coalesce_key(pending) == key:
+                del self.queue[index]
+                self.coalesced += 1
+                return True
+        return False
+
+    async def _write_loop(self):
+        try:
+            while True:
+                while not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                frame = self.queue.popleft()
+                if self.binary:
+                    await self.websocket.send_bytes(frame.packed)
+                else:
+                    await self.websocket.send_text(frame.text)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.close()
+
+    async def _close_for_resync(self):
+        await self.close_with(RESYNC_CLOSE_CODE, RESYNC_CLOSE_REASON)
+
+    async def close_with(self, code: int, reason: str):
+        self.close()
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        self._on_close(self)
+
+
+def _discard(index: dict[int, dict[int, Connection]], key: int, connection_id: int):
+    entries = index.get(key)
+    if entries is not None:
+        entries.pop(connection_id, None)
+        if not entries:
+            del index[key]
+
+
+class ConnectionRegistry:
+    """Live connections by id, indexed by board and by user.
+
+    Each index maps to a dict keyed by connection id, so adding or removing
+    a connection is O(1) however many share its board.
+    """
+
+    def __init__(self):
+        self._connections: dict[int, Connection] = {}
+        self._by_board: dict[int, dict[int, Connection]] = {}
+        self._by_user: dict[int, dict[int, Connection]] = {}
+
+    def add(self, connection: Connection):
+        self._connections[connection.id] = connection
+        self._by_board.setdefault(connection.board_id, {})[connection.id] = connection
+        self._by_user.setdefault(connection.user_id, {})[connection.id] = connection
+
+    def remove(self, connection: Connection) -> bool:
+        if self._connections.pop(connection.id, None) is None:
+            return False
+        _discard(self._by_board, connection.board_id, connection.id)
+        _discard(self._by_user, connection.user_id, connection.id)
+        return True
+
+    def get(self, connection_id: int) -> Connection | None:
+        return self._connections.get(connection_id)
+
+    def on_board(self, board_id: int) -> dict[int, Connection]:
+        return self._by_board.get(board_id, {})
+
+    def of_user(self, user_id: int) -> Collection[Connection]:
+        return self._by_user.get(user_id, {}).values()
+
+    def board_count(self) -> int:
+        return len(self._by_board)
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def __iter__(self) -> Iterator[Connection]:
+        return iter(self._connections.values())
+
+
+class ConnectionManager:
+    def __init__(self, backend: BroadcastBackend):
+        self.registry = ConnectionRegistry()
+        self.node_id = uuid.uuid4().hex
+        self.backend = backend
+        self.backend.subscribe(self._deliver)
+        self.total_dropped = 0
+        self.total_coalesced = 0
+        self.overflow_disconnects = 0
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        board_id: int,
+        user_info: dict[str, Any],
+        grant: Any = None,
+        subprotocol: str | None = None,
+    ) -> Connection:
+        await websocket.accept(subprotocol=subprotocol)
+        connection = Connection(websocket, board_id, user_info, self._forget, grant, subprotocol)
+        self.registry.add(connection)
+        connection.start()
+        return connection
+
+    def disconnect(self, connection: Connection):
+        connection.close()
+
+    async def close_connections(
+        self,
+        matches: Callable[[Connection], bool],
+        code: int,
+        reason: str,
+        user_id: int | None = None,
+        board_id: int | None = None,
+    ) -> int:
+        """Close every connection ``matches`` accepts, looking only at ``user_id``'s or ``board_id``'s if given."""
+        if user_id is not None:
+            candidates: Collection[Connection] = self.registry.of_user(user_id)
+        elif board_id is not None:
+            candidates = self.registry.on_board(board_id).values()
+        else:
+            candidates = self.registry
+        doomed = [conn for conn in candidates if matches(conn)]
+        for connection in doomed:
+            await connection.close_with(code, reason)
+        return len(doomed)
+
+    def _forget(self, connection: Connection):
+        self.total_dropped += connection.dropped
+        self.total_coalesced += connection.coalesced
+        if connection.resync_requested:
+            self.overflow_disconnects += 1
+        self.registry.remove(connection)
+
+    async def broadcast(
+        self,
+        board_id: int,
+        message: dict[str, Any],
+        exclude: Connection | None = None,
+        ephemeral: bool = False,
+    ):
+        envelope = {
+            'origin': self.node_id,
+            'exclude': exclude.id if exclude else None,
+            'message': message,
+        }
+        if ephemeral:
+            # Delivered live only: not retained for resync.
+            envelope['ephemeral'] = True
+        await self.backend.publish(board_id, envelope)
+
+    async def _deliver(self, board_id: int, envelope: dict[str, Any]):
+        connections = self.registry.on_board(board_id)
+        if not connections:
+            return
+
+        # Connection ids are only meaningful on the replica that assigned them.
+        skip = connections.get(envelope['exclude']) if envelope['origin'] == self.node_id else None
+        frame = envelope['frame']
+        for connection in tuple(connections.values()):
+            if connection is not skip:
+                connection.enqueue(frame)
+
+    def stats(self) -> dict[str, Any]:
+        connections = list(self.registry)
+        depths = [len(conn.queue) for conn in connections]
+        return {
+            'boards': self.registry.board_count(),
+            'connections': len(connections),
+            'queue_depth_total': sum(depths),
+            'queue_depth_max': max(depths, default=0),
+            'dropped': self.total_dropped + sum(conn.dropped for conn in connections),
+            'coalesced': self.total_coalesced + sum(conn.coalesced for conn in connections),
+            'overflow_disconnects': self.overflow_disconnects,
+            'binary_connections': sum(conn.binary for conn in connections),
+        }
+
+
+manager = ConnectionManager(get_broadcast_backend())
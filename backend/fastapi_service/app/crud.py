@@ -0,0 +1,545 @@
+from __future__ import annotations
+
+import bisect
+from collections import Counter
+from datetime import datetime
+from typing import Any, Iterator
+
+from sqlalchemy import Integer, cast, column, delete, func, insert, or_, select, tuple_, update, values
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.encoding import encode
+from app.models import Card, CardAssignment
+from app.ranking import is_rank, rank_between, ranks_between, spread
+
+CARD_FIELDS = ('title', 'description', 'column', 'position')
+# Neighbour card ids that place a card within its column; not stored.
+ANCHOR_FIELDS = ('after_id', 'before_id')
+EDIT_FIELDS = CARD_FIELDS + ANCHOR_FIELDS
+MOVE_FIELDS = ('column', 'position') + ANCHOR_FIELDS
+# Fields a bulk patch may set; placement changes go through a bulk move.
+PATCH_FIELDS = ('title', 'description')
+
+BATCH_EVENT_TYPES = {
+    'card.create': 'card.created',
+    'card.update': 'card.updated',
+    'card.move': 'card.moved',
+    'card.delete': 'card.deleted',
+}
+
+
+class AssignmentExistsError(Exception):
+    pass
+
+
+def serialize_card(card: Card) -> dict[str, Any]:
+    return {
+        'id': card.id,
+        'board_id': card.board_id,
+        'title': card.title,
+        'description': card.description,
+        'column': card.column,
+        'position': card.position,
+        'rank': card.rank,
+        'created_by': card.created_by,
+        'created_at': card.created_at.isoformat(),
+        'updated_at': card.updated_at.isoformat(),
+        'assigned_to': [
+            {'id': a.id, 'user_id': a.user_id, 'assigned_at': a.assigned_at.isoformat()}
+            for a in card.assignments
+        ],
+    }
+
+
+def new_card_fields(data: dict[str, Any]) -> dict[str, Any]:
+    return {
+        'title': data.get('title', 'Untitled'),
+        'description': data.get('description'),
+        'column': data.get('column', 'todo'),
+        'position': data.get('position', 0),
+    }
+
+
+def _place(db: Session, card: Card, column: str, data: dict[str, Any]):
+    """Rank ``card`` in ``column`` next to an anchor card, at ``position``, or else last."""
+    # Sessions do not autoflush; earlier changes in the same batch must be visible.
+    db.flush()
+    others = db.query(Card.rank).filter(Card.board_id == card.board_id, Card.column == column)
+    if card.id is not None:
+        others = others.filter(Card.id != card.id)
+
+    lower = upper = None
+    after_id, before_id = data.get('after_id'), data.get('before_id')
+    anchor_id = after_id if after_id is not None else before_id
+    anchor = others.filter(Card.id == anchor_id).scalar() if anchor_id is not None else None
+    if anchor is not None:
+        if after_id is not None:
+            lower = anchor
+            upper = others.filter(Card.rank > lower).with_entities(func.min(Card.rank)).scalar()
+        else:
+            upper = anchor
+            lower = others.filter(Card.rank < upper).with_entities(func.max(Card.rank)).scalar()
+    elif data.get('position') is not None:
+        ranks = [rank for (rank,) in others.order_by(Card.rank, Card.id)]
+        index = min(max(data['position'], 0), len(ranks))
+        lower = ranks[index - 1] if index else None
+        # Skip past cards sharing the lower rank, e.g. from concurrent appends.
+        upper = next((rank for rank in ranks[index:] if lower is None or rank > lower), None)
+    else:
+        lower = others.with_entities(func.max(Card.rank)).scalar()
+    card.rank = rank_between(lower, upper)
+
+
+def _apply(db: Session, card: Card, data: dict[str, Any]):
+    moved = any(data.get(name) is not None for name in ('position',) + ANCHOR_FIELDS) or (
+        'column' in data and data['column'] != card.column
+    )
+    if moved:
+        _place(db, card, data.get('column', card.column), data)
+    for name in CARD_FIELDS:
+        if name in data:
+            setattr(card, name, data[name])
+
+
+def _get_card(db: Session, card_id: int, board_id: int | None = None) -> Card | None:
+    query = db.query(Card).options(selectinload(Card.assignments)).filter(Card.id == card_id)
+    if board_id is not None:
+        query = query.filter(Card.board_id == board_id)
+    return query.first()
+
+
+def list_cards(
+    db: Session, board_id: int, after: tuple[str, str, int] | None = None, limit: int | None = None
+) -> list[dict[str, Any]]:
+    query = db.query(Card).options(selectinload(Card.assignments)).filter(Card.board_id == board_id)
+    if after is not None:
+        # Seeks along the (board_id, column, rank) index rather than skipping rows.
+        query = query.filter(tuple_(Card.column, Card.rank, Card.id) > tuple_(*after))
+    query = query.order_by(Card.column, Card.rank, Card.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return [serialize_card(card) for card in query]
+
+
+def get_card(db: Session, card_id: int, board_id: int | None = None) -> dict[str, Any] | None:
+    card = _get_card(db, card_id, board_id)
+    return serialize_card(card) if card else None
+
+
+def create_card(db: Session, board_id: int, created_by: int, data: dict[str, Any]) -> dict[str, Any]:
+    card = Card(board_id=board_id, created_by=created_by, **new_card_fields(data))
+    _place(db, card, card.column, data)
+    db.add(card)
+    db.commit()
+    db.refresh(card)
+    return serialize_card(card)
+
+
+def update_card(
+    db: Session, card_id: int, data: dict[str, Any], board_id: int | None = None
+) -> dict[str, Any] | None:
+    card = _get_card(db, card_id, board_id)
+    if not card:
+        return None
+    _apply(db, card, data)
+    db.commit()
+    db.refresh(card)
+    return serialize_card(card)
+
+
+def delete_card(db: Session, card_id: int, board_id: int | None = None) -> dict[str, Any] | None:
+    card = _get_card(db, card_id, board_id)
+    if not card:
+        return None
+    deleted = {'id': card.id, 'board_id': card.board_id}
+    db.delete(card)
+    db.commit()
+    return deleted
+
+
+def assign_user(db: Session, card_id: int, user_id: int, board_id: int | None = None) -> dict[str, Any] | None:
+    card = _get_card(db, card_id, board_id)
+    if not card:
+        return None
+
+    existing = db.query(CardAssignment).filter(
+        CardAssignment.card_id == card_id,
+        CardAssignment.user_id == user_id
+    ).first()
+    if existing:
+        raise AssignmentExistsError
+
+    db.add(CardAssignment(card_id=card_id, user_id=user_id))
+    db.commit()
+    db.refresh(card)
+    return serialize_card(card)
+
+
+def unassign_user(db: Session, card_id: int, user_id: int, board_id: int | None = None) -> dict[str, Any] | None:
+    query = db.query(CardAssignment).filter(
+        CardAssignment.card_id == card_id,
+        CardAssignment.user_id == user_id
+    )
+    if board_id is not None:
+        query = query.join(CardAssignment.card).filter(Card.board_id == board_id)
+    assignment = query.first()
+    if not assignment:
+        return None
+
+    card = assignment.card
+    db.delete(assignment)
+    db.commit()
+    db.refresh(card)
+    return serialize_card(card)
+
+
+def apply_batch(
+    db: Session, board_id: int, created_by: int, operations: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """Apply card operations in one transaction and return the resulting events.
+
+    Operations that reference a card missing from the board are skipped.
+    """
+    operations = [
+        (op.get('action'), op.get('data') or {})
+        for op in operations
+        if isinstance(op, dict) and op.get('action') in BATCH_EVENT_TYPES
+    ]
+    referenced = {data.get('id') for action, data in operations if action != 'card.create'}
+    referenced.discard(None)
+    cards = {}
+    if referenced:
+        cards = {
+            card.id: card
+            for card in db.query(Card).filter(Card.board_id == board_id, Card.id.in_(referenced))
+        }
+
+    applied: list[tuple[str, Card | dict[str, Any]]] = []
+    for action, data in operations:
+        if action == 'card.create':
+            card = Card(board_id=board_id, created_by=created_by, **new_card_fields(data))
+            _place(db, card, card.column, data)
+            db.add(card)
+            applied.append((action, card))
+            continue
+
+        card = cards.get(data.get('id'))
+        if card is None:
+            continue
+        if action == 'card.delete':
+            del cards[card.id]
+            db.delete(card)
+            applied.append((action, {'id': card.id, 'board_id': board_id}))
+        else:
+            names = EDIT_FIELDS if action == 'card.update' else MOVE_FIELDS
+            _apply(db, card, {name: data[name] for name in names if name in data})
+            applied.append((action, card))
+
+    if not applied:
+        return []
+    db.flush()
+    ids = [card.id for action, card in applied if action != 'card.delete']
+    db.commit()
+
+    fresh = {}
+    if ids:
+        fresh = {
+            card.id: card
+            for card in db.query(Card).options(selectinload(Card.assignments)).filter(Card.id.in_(ids))
+        }
+    remaining = iter(ids)
+    events = []
+    for action, card in applied:
+        if action == 'card.delete':
+            events.append({'type': BATCH_EVENT_TYPES[action], 'data': card})
+            continue
+        card_id = next(remaining)
+        if card_id in fresh:
+            events.append({'type': BATCH_EVENT_TYPES[action], 'data': serialize_card(fresh[card_id])})
+    return events
+
+
+def rebalance_column(db: Session, board_id: int, column: str) -> list[dict[str, Any]]:
+    """Respace the ranks in a column evenly, returning the cards whose rank changed."""
+    cards = (
+        db.query(Card)
+        .options(selectinload(Card.assignments))
+        .filter(Card.board_id == board_id, Card.column == column)
+        .order_by(Card.rank, Card.id)
+        .with_for_update()
+        .all()
+    )
+    changed = []
+    for card, rank in zip(cards, spread(len(cards))):
+        if card.rank != rank:
+            card.rank = rank
+            changed.append(card)
+    db.flush()
+    result = [serialize_card(card) for card in changed]
+    db.commit()
+    return result
+
+
+def _fresh_cards(db: Session, board_id: int, ids: list[int]) -> dict[int, dict[str, Any]]:
+    if not ids:
+        return {}
+    query = (
+        db.query(Card)
+        .options(selectinload(Card.assignments))
+        .filter(Card.board_id == board_id, Card.id.in_(ids))
+    )
+    return {card.id: serialize_card(card) for card in query}
+
+
+def bulk_create_cards(
+    db: Session, board_id: int, created_by: int, items: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """Insert cards with one multi-row INSERT, appended to their columns in order."""
+    rows = [{**new_card_fields(data), 'board_id': board_id, 'created_by': created_by} for data in items]
+    columns = {}
+    for row in rows:
+        columns.setdefault(row['column'], []).append(row)
+    tails = dict(
+        db.query(Card.column, func.max(Card.rank))
+        .filter(Card.board_id == board_id, Card.column.in_(columns))
+        .group_by(Card.column)
+    )
+    for name, column_rows in columns.items():
+        for row, rank in zip(column_rows, ranks_between(tails.get(name), None, len(column_rows))):
+            row['rank'] = rank
+
+    now = datetime.utcnow()
+    for row in rows:
+        row['created_at'] = row['updated_at'] = now
+    cards = db.scalars(insert(Card).returning(Card, sort_by_parameter_order=True), rows).all()
+    for card in cards:
+        set_committed_value(card, 'assignments', [])
+    result = [serialize_card(card) for card in cards]
+    db.commit()
+    return result
+
+
+def bulk_update_cards(db: Session, board_id: int, items: list[dict[str, Any]]) -> dict[int, dict[str, Any]]:
+    """Apply edits with one UPDATE ... FROM (VALUES ...) per distinct set of fields.
+
+    Returns the cards by id; ids not on the board are left out.
+    """
+    cards = Card.__table__
+    # Later edits of the same card win.
+    merged: dict[int, dict[str, Any]] = {}
+    for data in items:
+        merged.setdefault(data['id'], {}).update(data)
+    groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+    for data in merged.values():
+        names = tuple(name for name in PATCH_FIELDS if name in data)
+        if names:
+            groups.setdefault(names, []).append(data)
+
+    now = datetime.utcnow()
+    for names, group in groups.items():
+        changes = values(
+            column('id', Integer), *(column(name, cards.c[name].type) for name in names), name='changes'
+        ).data([(data['id'], *(data[name] for name in names)) for data in group])
+        db.execute(
+            update(cards)
+            .where(cards.c.board_id == board_id, cards.c.id == changes.c.id)
+            .values({**{name: changes.c[name] for name in names}, 'updated_at': now})
+        )
+    db.commit()
+    return _fresh_cards(db, board_id, list(merged))
+
+
+def _appends(data: dict[str, Any]) -> bool:
+    return all(data.get(name) is None for name in ('position',) + ANCHOR_FIELDS)
+
+
+def _rank_among(entries: list[tuple[str, int]], data: dict[str, Any]) -> str:
+    """Like _place, against the (rank, id) entries of a column held in memory."""
+    lower = upper = None
+    after_id, before_id = data.get('after_id'), data.get('before_id')
+    anchor_id = after_id if after_id is not None else before_id
+    anchor = next((rank for rank, card_id in entries if card_id == anchor_id), None) if anchor_id is not None else None
+    if anchor is not None:
+        if after_id is not None:
+            lower = anchor
+            upper = next((rank for rank, _ in entries if rank > lower), None)
+        else:
+            upper = anchor
+            lower = next((rank for rank, _ in reversed(entries) if rank < upper), None)
+    elif data.get('position') is not None:
+        index = min(max(data['position'], 0), len(entries))
+        lower = entries[index - 1][0] if index else None
+        upper = next((rank for rank, _ in entries[index:] if lower is None or rank > lower), None)
+    else:
+        lower = entries[-1][0] if entries else None
+    return rank_between(lower, upper)
+
+
+def bulk_move_cards(db: Session, board_id: int, items: list[dict[str, Any]]) -> dict[int, dict[str, Any]]:
+    """Re-rank cards in memory, in order, and write them with one UPDATE ... FROM (VALUES ...).
+
+    Returns the moved cards by id; ids not on the board are left out.
+    """
+    cards = Card.__table__
+    ids = [data['id'] for data in items]
+    targets = {data['column'] for data in items if data.get('column') is not None}
+    # Moves that leave out column are placed within their source column, so load all of it.
+    sources = select(cards.c.column).where(cards.c.board_id == board_id, cards.c.id.in_(ids))
+    rows = db.execute(
+        select(cards.c.id, cards.c.column, cards.c.rank)
+        .where(cards.c.board_id == board_id, or_(cards.c.column.in_(targets), cards.c.column.in_(sources)))
+        .order_by(cards.c.rank, cards.c.id)
+        .with_for_update()
+    ).all()
+    columns: dict[str, list[tuple[str, int]]] = {}
+    located: dict[int, tuple[str, str]] = {}
+    for card_id, name, rank in rows:
+        columns.setdefault(name, []).append((rank, card_id))
+        located[card_id] = (name, rank)
+
+    items = [data for data in items if data['id'] in located]
+    appended = [data.get('column') or located[data['id']][0] for data in items if _appends(data)]
+    # Cards sent to the end of a column share ranks bisected from its tail,
+    # rather than each stepping one digit past the last.
+    reserved = {
+        name: iter(ranks_between(columns[name][-1][0] if columns.get(name) else None, None, count))
+        for name, count in Counter(appended).items()
+    }
+
+    placed = {}
+    for data in items:
+        card_id = data['id']
+        source, rank = located[card_id]
+        columns[source].remove((rank, card_id))
+        target = data.get('column') or source
+        entries = columns.setdefault(target, [])
+        rank = None
+        if _appends(data):
+            rank = next(reserved[target])
+            if entries and rank <= entries[-1][0]:
+                rank = None
+        if rank is None:
+            rank = _rank_among(entries, data)
+        bisect.insort(entries, (rank, card_id))
+        located[card_id] = (target, rank)
+        placed[card_id] = (card_id, target, rank, data.get('position'))
+
+    if placed:
+        moves = values(
+            column('id', Integer),
+            column('column', cards.c.column.type),
+            column('rank', cards.c.rank.type),
+            column('position', Integer),
+            name='moves',
+        ).data(list(placed.values()))
+        db.execute(
+            update(cards)
+            .where(cards.c.id == moves.c.id)
+            .values(
+                column=moves.c.column,
+                rank=moves.c.rank,
+                position=func.coalesce(cast(moves.c.position, Integer), cards.c.position),
+                updated_at=datetime.utcnow(),
+            )
+        )
+    db.commit()
+    return _fresh_cards(db, board_id, list(placed))
+
+
+def bulk_delete_cards(db: Session, board_id: int, ids: list[int]) -> set[int]:
+    """Delete cards and their assignments with one DELETE ... WHERE id IN each; returns the ids deleted."""
+    cards = Card.__table__
+    on_board = (cards.c.board_id == board_id, cards.c.id.in_(ids))
+    assignments = CardAssignment.__table__
+    db.execute(delete(assignments).where(assignments.c.card_id.in_(select(cards.c.id).where(*on_board))))
+    deleted = set(db.scalars(delete(cards).where(*on_board).returning(cards.c.id)))
+    db.commit()
+    return deleted
+
+
+def export_cards(db: Session, board_id: int, chunk_size: int) -> Iterator[str]:
+    """The board's cards as NDJSON, ``chunk_size`` cards per chunk.
+
+    Cards come from a server-side cursor, and each chunk's assignments from
+    one IN query, so memory use does not grow with the board.
+    """
+    statement = (
+        select(Card)
+        .options(selectinload(Card.assignments))
+        .where(Card.board_id == board_id)
+        .order_by(Card.column, Card.rank, Card.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    for cards in db.scalars(statement).partitions():
+        yield ''.join(encode(serialize_card(card)) + '\n' for card in cards)
+
+
+def import_cards(
+    db: Session, board_id: int, created_by: int, records: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """Insert exported cards and their assignments with one multi-row INSERT each.
+
+    Valid ranks are kept so an exported board keeps its order; cards without
+    one are appended to their columns.
+    """
+    now = datetime.utcnow()
+    rows = []
+    for record in records:
+        rows.append({
+            **new_card_fields(record),
+            'board_id': board_id,
+            'created_by': record.get('created_by') or created_by,
+            'rank': record['rank'] if record.get('rank') and is_rank(record['rank']) else None,
+            'created_at': record.get('created_at') or now,
+            'updated_at': now,
+        })
+
+    unranked: dict[str, list[dict[str, Any]]] = {}
+    tails: dict[str, str] = {}
+    for row in rows:
+        if row['rank'] is None:
+            unranked.setdefault(row['column'], []).append(row)
+        elif row['rank'] > tails.get(row['column'], ''):
+            tails[row['column']] = row['rank']
+    if unranked:
+        stored = (
+            db.query(Card.column, func.max(Card.rank))
+            .filter(Card.board_id == board_id, Card.column.in_(unranked))
+            .group_by(Card.column)
+        )
+        for name, rank in stored:
+            tails[name] = max(tails.get(name, ''), rank or '')
+        for name, column_rows in unranked.items():
+            for row, rank in zip(column_rows, ranks_between(tails.get(name) or None, None, len(column_rows))):
+                row['rank'] = rank
+
+    cards = db.scalars(insert(Card).returning(Card, sort_by_parameter_order=True), rows).all()
+    assignment_rows = [
+        {'card_id': card.id, 'user_id': assignment['user_id'], 'assigned_at': assignment.get('assigned_at') or now}
+        for card, record in zip(cards, records)
+        for assignment in record.get('assigned_to') or ()
+    ]
+    assigned: dict[int, list[CardAssignment]] = {}
+    if assignment_rows:
+        statement = insert(CardAssignment).returning(CardAssignment, sort_by_parameter_order=True)
+        for assignment in db.scalars(statement, assignment_rows):
+            assigned.setdefault(assignment.card_id, []).append(assignment)
+    for card in cards:
+        set_committed_value(card, 'assignments', assigned.get(card.id, []))
+    result = [serialize_card(card) for card in cards]
+    db.commit()
+    return result
+
+
+def search_cards(db: Session, board_id: int, tokens: list[str], limit: int) -> list[dict[str, Any]]:
+    """Cards whose title or description has a word starting with every token, best ranked first."""
+    query = func.to_tsquery('simple', ' & '.join(f'{token}:*' for token in tokens))
+    cards = (
+        db.query(Card)
+        .options(selectinload(Card.assignments))
+        .filter(Card.board_id == board_id, Card.search_vector.op('@@')(query))
+        .order_by(func.ts_rank(Card.search_vector, query).desc(), Card.id)
+        .limit(limit)
+    )
+    return [serialize_card(card) for card in cards]
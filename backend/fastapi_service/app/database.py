@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterable, TypeVar
 
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 load_dotenv()
 
@@ -15,9 +22,32 @@ POSTGRES_HOST = os.getenv('POSTGRES_HOST', 'localhost')
 POSTGRES_PORT = os.getenv('POSTGRES_PORT', '5432')
 POSTGRES_DB = os.getenv('POSTGRES_DB', 'collaboration_board')
 
-DATABASE_URL = f'postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}'
+DB_EXECUTOR_WORKERS = int(os.getenv('DB_EXECUTOR_WORKERS', '8'))
 
-engine = create_engine(DATABASE_URL)
+# Every session is opened on an executor thread, so one pooled connection per
+# worker is enough; overflow only covers work outside the executor.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', str(DB_EXECUTOR_WORKERS)))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '2'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+# Each stream_db iteration holds a pooled connection for as long as the client reads, so only
+# this many run at once; the rest wait, leaving the pool to run_db.
+DB_STREAM_MAX_CONCURRENCY = int(os.getenv('DB_STREAM_MAX_CONCURRENCY', str(max(1, DB_POOL_SIZE // 4))))
+
+# A full SQLAlchemy URL, such as a scratch database for benchmarks, overrides the POSTGRES_* settings.
+DATABASE_URL = os.getenv('DATABASE_URL') or (
+    f'postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}'
+)
+
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -29,3 +59,123 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+T = TypeVar('T')
+
+# Synchronous SQLAlchemy work runs here so async handlers never block the event loop.
+db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix='db')
+
+
+class DBStats:
+    """Wait times for run_db: queued for an executor thread, then checking out a connection."""
+
+    def __init__(self):
+        self.calls = 0
+        self.timeouts = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, queue_wait: float, checkout_wait: float):
+        with self._lock:
+            self.calls += 1
+            self.queue_wait_total += queue_wait
+            self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+            self.checkout_wait_total += checkout_wait
+            self.checkout_wait_max = max(self.checkout_wait_max, checkout_wait)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            calls = self.calls or 1
+            return {
+                'calls': self.calls,
+                'timeouts': self.timeouts,
+                'queue_wait_avg_ms': round(self.queue_wait_total / calls * 1000, 3),
+                'queue_wait_max_ms': round(self.queue_wait_max * 1000, 3),
+                'checkout_wait_avg_ms': round(self.checkout_wait_total / calls * 1000, 3),
+                'checkout_wait_max_ms': round(self.checkout_wait_max * 1000, 3),
+            }
+
+
+db_stats = DBStats()
+
+stream_slots = asyncio.Semaphore(DB_STREAM_MAX_CONCURRENCY)
+
+
+def _run_in_session(submitted: float, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    started = time.perf_counter()
+    db: Session = SessionLocal()
+    try:
+        try:
+            # Check the connection out up front so the wait is measured on its own.
+            db.connection()
+        except PoolTimeoutError:
+            db_stats.record_timeout()
+            raise
+        db_stats.record(started - submitted, time.perf_counter() - started)
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``fn(session, *args, **kwargs)`` on the DB executor with a short-lived session."""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(_run_in_session, time.perf_counter(), fn, *args, **kwargs)
+    return await loop.run_in_executor(db_executor, call)
+
+
+def _close_stream(db: Session, iterator: Any):
+    try:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            close()
+    finally:
+        db.close()
+
+
+async def stream_db(fn: Callable[..., Iterable[T]], *args: Any, **kwargs: Any) -> AsyncIterator[T]:
+    """Iterate ``fn(session, *args, **kwargs)`` on the DB executor, one item per executor call.
+
+    The session, and any server-side cursor behind the iterable, stays open
+    until iteration finishes or the consumer stops early. At most
+    ``DB_STREAM_MAX_CONCURRENCY`` streams hold a session at once; later ones
+    wait for a slot before opening theirs.
+    """
+    loop = asyncio.get_running_loop()
+    async with stream_slots:
+        db = SessionLocal()
+        iterator = None
+        done = object()
+        try:
+            iterator = await loop.run_in_executor(db_executor, lambda: iter(fn(db, *args, **kwargs)))
+            while True:
+                item = await loop.run_in_executor(db_executor, next, iterator, done)
+                if item is done:
+                    return
+                yield item
+        finally:
+            await loop.run_in_executor(db_executor, _close_stream, db, iterator)
+
+
+def pool_stats() -> dict[str, Any]:
+    pool = engine.pool
+    stats: dict[str, Any] = {'class': type(pool).__name__}
+    if hasattr(pool, 'checkedout'):
+        stats.update({
+            'size': pool.size(),
+            'max_overflow': DB_MAX_OVERFLOW,
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            # QueuePool.overflow() counts from -pool_size; report only connections opened beyond the pool.
+            'overflow': max(pool.overflow(), 0),
+        })
+    stats.update(db_stats.snapshot())
+    return stats
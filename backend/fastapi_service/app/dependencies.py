@@ -3,11 +3,13 @@ from __future__ import annotations
 import os
 from typing import Any
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from dotenv import load_dotenv
 
+from app.board_access import BoardGrant, board_access
+
 load_dotenv()
 
 JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key-here')
@@ -34,3 +36,19 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             detail='Invalid authentication credentials',
             headers={'WWW-Authenticate': 'Bearer'},
         )
+
+
+def get_board_grant(
+    x_board_access: str | None = Header(None),
+    current_user: dict[str, Any] = Depends(get_current_user),
+) -> BoardGrant | None:
+    """The caller's board-access grant, or None when grants are not enforced."""
+    if not board_access.required:
+        return None
+    grant = board_access.verify(x_board_access, current_user['user_id']) if x_board_access else None
+    if grant is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='Missing, expired or revoked board access grant',
+        )
+    return grant
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import msgpack
+import orjson
+
+# WebSocket subprotocol carrying the same messages as MessagePack binary frames.
+MSGPACK_SUBPROTOCOL = 'collaboration-board.v1.msgpack'
+
+# Integer codes used in place of strings on the MessagePack subprotocol. Codes are
+# part of the protocol: append new names, never reorder. Unknown names pass through.
+MESSAGE_TYPES = (
+    'card.created',
+    'card.updated',
+    'card.moved',
+    'card.moving',
+    'card.deleted',
+    'initial_state',
+    'resync',
+    'batch',
+    'error',
+    'ping',
+    'rate_limited',
+)
+ACTIONS = ('card.create', 'card.update', 'card.move', 'card.delete', 'batch', 'pong')
+COLUMNS = ('todo', 'in_progress', 'done')
+
+MESSAGE_TYPE_CODES = {name: code for code, name in enumerate(MESSAGE_TYPES)}
+COLUMN_CODES = {name: code for code, name in enumerate(COLUMNS)}
+
+# Full cards travel as arrays in this field order, assignments as [id, user_id, assigned_at],
+# and timestamps as integer milliseconds since the epoch.
+CARD_FIELDS = (
+    'id', 'board_id', 'title', 'description', 'column', 'position', 'rank',
+    'created_by', 'created_at', 'updated_at', 'assigned_to',
+)
+CARD_MESSAGE_TYPES = ('card.created', 'card.updated', 'card.moved')
+EPOCH = datetime(1970, 1, 1)
+MILLISECOND = timedelta(milliseconds=1)
+
+
+def encode(message: Any) -> str:
+    return orjson.dumps(message).decode()
+
+
+def decode(data: str | bytes) -> Any:
+    return orjson.loads(data)
+
+
+def _millis(value: str | datetime) -> int:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    # Stored timestamps are naive UTC.
+    return (value - EPOCH) // MILLISECOND
+
+
+def _card_row(card: dict[str, Any]) -> list[Any]:
+    # In CARD_FIELDS order.
+    return [
+        card['id'],
+        card['board_id'],
+        card['title'],
+        card['description'],
+        COLUMN_CODES.get(card['column'], card['column']),
+        card['position'],
+        card['rank'],
+        card['created_by'],
+        _millis(card['created_at']),
+        _millis(card['updated_at']),
+        [
+            [assignment['id'], assignment['user_id'], _millis(assignment['assigned_at'])]
+            for assignment in card['assigned_to']
+        ],
+    ]
+
+
+def _compact_message(message: dict[str, Any]) -> dict[str, Any]:
+    compact = message.copy()
+    message_type = message.get('type')
+    compact['type'] = MESSAGE_TYPE_CODES.get(message_type, message_type)
+    data = message.get('data')
+    if message_type in ('resync', 'batch'):
+        compact['data'] = [_compact_message(event) for event in data]
+    elif message_type == 'initial_state':
+        compact['data'] = [_card_row(card) for card in data]
+    elif message_type in CARD_MESSAGE_TYPES:
+        compact['data'] = _card_row(data)
+    elif isinstance(data, dict) and 'column' in data:
+        # Partial cards, such as card.moving positions, stay maps.
+        compact['data'] = {**data, 'column': COLUMN_CODES.get(data['column'], data['column'])}
+    return compact
+
+
+def pack(message: dict[str, Any]) -> bytes:
+    """Server message as a MessagePack frame: cards as arrays, compact timestamps, enum codes."""
+    return msgpack.packb(_compact_message(message))
+
+
+def _expand_action(action: Any) -> Any:
+    if not isinstance(action, dict):
+        return action
+    expanded = action.copy()
+    code = action.get('action')
+    if isinstance(code, int) and 0 <= code < len(ACTIONS):
+        expanded['action'] = ACTIONS[code]
+    data = action.get('data')
+    if expanded.get('action') == 'batch' and isinstance(data, list):
+        expanded['data'] = [_expand_action(operation) for operation in data]
+    elif isinstance(data, dict):
+        column = data.get('column')
+        if isinstance(column, int) and 0 <= column < len(COLUMNS):
+            expanded['data'] = {**data, 'column': COLUMNS[column]}
+    return expanded
+
+
+def unpack(data: bytes) -> Any:
+    """Client action from a MessagePack frame, with enum codes turned back into names."""
+    return _expand_action(msgpack.unpackb(data))
+
+
+class Frame:
+    """A message plus its wire encodings, computed once and shared by every recipient."""
+
+    __slots__ = ('message', '_text', '_packed')
+
+    def __init__(self, message: dict[str, Any]):
+        self.message = message
+        self._text: str | None = None
+        self._packed: bytes | None = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = encode(self.message)
+        return self._text
+
+    @property
+    def packed(self) -> bytes:
+        if self._packed is None:
+            self._packed = pack(self.message)
+        return self._packed
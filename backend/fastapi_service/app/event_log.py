@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any
+
+from app.encoding import Frame
+
+EVENT_LOG_SIZE = int(os.getenv('EVENT_LOG_SIZE', '500'))
+EVENT_LOG_MAX_BOARDS = int(os.getenv('EVENT_LOG_MAX_BOARDS', '5000'))
+
+
+class BoardLog:
+    __slots__ = ('frames', 'floor_seq', 'last_seq', 'modified_at')
+
+    def __init__(self, floor_seq: int, max_events: int):
+        self.frames: deque[Frame] = deque(maxlen=max_events)
+        # Events for this board numbered at or below floor_seq may be missing.
+        self.floor_seq = floor_seq
+        self.last_seq = floor_seq
+        # Wall-clock time the last event arrived; never earlier than the board's actual last change.
+        self.modified_at = time.time()
+
+
+class BoardEventLog:
+    """Recent events per board, so reconnecting clients can catch up without a full snapshot.
+
+    A board's position, the number of its latest event, doubles as its
+    version: it rises whenever the board's cards change, on any replica.
+    """
+
+    def __init__(self, max_events: int = EVENT_LOG_SIZE, max_boards: int = EVENT_LOG_MAX_BOARDS):
+        self.max_events = max_events
+        self.max_boards = max_boards
+        self.floor_seq = 0
+        self.floor_at = time.time()
+        # Highest sequence number recorded for any board.
+        self.last_seq = 0
+        self.resyncs = 0
+        self.fallbacks = 0
+        self._boards: OrderedDict[int, BoardLog] = OrderedDict()
+        # Highest sequence number, and latest change, ever dropped along with an evicted board.
+        self._evicted_seq = 0
+        self._evicted_at = 0.0
+
+    def reset(self, floor_seq: int):
+        self._boards.clear()
+        self.floor_seq = floor_seq
+        self.floor_at = time.time()
+        self.last_seq = max(self.last_seq, floor_seq)
+        self._evicted_seq = 0
+        self._evicted_at = 0.0
+
+    def _board_floor(self) -> int:
+        return max(self.floor_seq, self._evicted_seq)
+
+    def record(self, board_id: int, frame: Frame):
+        seq = frame.message['seq']
+        log = self._boards.get(board_id)
+        if log is None:
+            log = BoardLog(self._board_floor(), self.max_events)
+            self._boards[board_id] = log
+            if len(self._boards) > self.max_boards:
+                _, evicted = self._boards.popitem(last=False)
+                self._evicted_seq = max(self._evicted_seq, evicted.last_seq)
+                self._evicted_at = max(self._evicted_at, evicted.modified_at)
+        else:
+            self._boards.move_to_end(board_id)
+
+        if len(log.frames) == log.frames.maxlen:
+            log.floor_seq = log.frames[0].message['seq']
+        log.frames.append(frame)
+        log.last_seq = max(log.last_seq, seq)
+        log.modified_at = time.time()
+        self.last_seq = max(self.last_seq, seq)
+
+    async def on_event(self, board_id: int, envelope: dict[str, Any]):
+        if not envelope.get('ephemeral'):
+            self.record(board_id, envelope['frame'])
+
+    def position(self, board_id: int) -> int:
+        log = self._boards.get(board_id)
+        return log.last_seq if log is not None else self._board_floor()
+
+    def modified_at(self, board_id: int) -> float:
+        log = self._boards.get(board_id)
+        return log.modified_at if log is not None else max(self.floor_at, self._evicted_at)
+
+    def since(self, board_id: int, seq: int) -> list[Frame] | None:
+        """Frames for ``board_id`` numbered after ``seq``, or None if some may have been lost."""
+        log = self._boards.get(board_id)
+        floor_seq = log.floor_seq if log is not None else self._board_floor()
+        if seq < floor_seq:
+            self.fallbacks += 1
+            return None
+        self.resyncs += 1
+        return self.replay(board_id, seq)
+
+    def replay(self, board_id: int, seq: int) -> list[Frame]:
+        log = self._boards.get(board_id)
+        if log is None:
+            return []
+        return [frame for frame in log.frames if frame.message['seq'] > seq]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'boards': len(self._boards),
+            'events': sum(len(log.frames) for log in self._boards.values()),
+            'floor_seq': self.floor_seq,
+            'resyncs': self.resyncs,
+            'fallbacks': self.fallbacks,
+        }
+
+
+event_log = BoardEventLog()
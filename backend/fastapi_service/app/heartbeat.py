@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import time
+from typing import Any
+
+from app.connections import Connection
+from app.encoding import Frame
+
+logger = logging.getLogger(__name__)
+
+# A connection silent this long is pinged, and reaped once silent for the timeout.
+WS_HEARTBEAT_INTERVAL = float(os.getenv('WS_HEARTBEAT_INTERVAL', '25'))
+WS_HEARTBEAT_TIMEOUT = float(os.getenv('WS_HEARTBEAT_TIMEOUT', '60'))
+# Resolution of the timer wheel, in seconds.
+WS_HEARTBEAT_TICK = float(os.getenv('WS_HEARTBEAT_TICK', '1'))
+
+# Application close code for sockets that stopped answering heartbeats.
+HEARTBEAT_CLOSE_CODE = 4001
+HEARTBEAT_CLOSE_REASON = 'heartbeat_timeout'
+
+if WS_HEARTBEAT_TIMEOUT <= WS_HEARTBEAT_INTERVAL:
+    raise ValueError('WS_HEARTBEAT_TIMEOUT must be longer than WS_HEARTBEAT_INTERVAL')
+
+
+class TimerWheel:
+    """Items bucketed by the tick their next check falls due.
+
+    Scheduling is O(1) and each turn touches only the items due, however
+    many are scheduled. Delays beyond the wheel's span are capped; the
+    caller reschedules what is not yet due.
+    """
+
+    def __init__(self, tick: float, slots: int):
+        self.tick = tick
+        self.position = 0
+        self._slots: list[set[Any]] = [set() for _ in range(slots)]
+
+    def schedule(self, item: Any, delay: float):
+        ticks = min(max(1, math.ceil(delay / self.tick)), len(self._slots) - 1)
+        self._slots[(self.position + ticks) % len(self._slots)].add(item)
+
+    def advance(self) -> set[Any]:
+        self.position += 1
+        index = self.position % len(self._slots)
+        due, self._slots[index] = self._slots[index], set()
+        return due
+
+    def __len__(self) -> int:
+        return sum(len(slot) for slot in self._slots)
+
+
+class Heartbeat:
+    """Pings quiet WebSocket connections and reaps those that stop answering.
+
+    Any message from a client counts as a sign of life, so only idle
+    connections are pinged. Half-open sockets, such as those of a laptop
+    that went to sleep, are dropped from the registry together on the tick
+    they time out, instead of lingering until a send fails.
+    """
+
+    def __init__(
+        self,
+        interval: float = WS_HEARTBEAT_INTERVAL,
+        timeout: float = WS_HEARTBEAT_TIMEOUT,
+        tick: float = WS_HEARTBEAT_TICK,
+    ):
+        self.interval = interval
+        self.timeout = timeout
+        self.wheel = TimerWheel(tick, math.ceil(timeout / tick) + 1)
+        self.pings_sent = 0
+        self.reaped = 0
+        self.last_reaped = 0
+        self.sweeps = 0
+        self._ping = Frame({'type': 'ping'})
+        self._task: asyncio.Task | None = None
+        self._closing: set[asyncio.Task] = set()
+
+    def track(self, connection: Connection):
+        self.wheel.schedule(connection, self.interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        started = time.monotonic()
+        while True:
+            await asyncio.sleep(self.wheel.tick)
+            # Catch up on ticks missed while the loop was busy.
+            due: list[Connection] = []
+            while self.wheel.position < int((time.monotonic() - started) / self.wheel.tick):
+                due.extend(self.wheel.advance())
+            try:
+                self.sweep(due)
+            except Exception:
+                logger.exception('Heartbeat sweep failed')
+
+    def sweep(self, connections: list[Connection]):
+        now = time.monotonic()
+        dead = []
+        for connection in connections:
+            if connection.closed:
+                continue
+            idle = now - connection.last_seen
+            if idle >= self.timeout:
+                dead.append(connection)
+            elif idle >= self.interval:
+                connection.enqueue(self._ping)
+                self.pings_sent += 1
+                self.wheel.schedule(connection, self.timeout - idle)
+            else:
+                self.wheel.schedule(connection, self.interval - idle)
+
+        self.sweeps += 1
+        self.last_reaped = len(dead)
+        if dead:
+            self.reaped += len(dead)
+            for connection in dead:
+                connection.close()
+            # Closing handshakes with unresponsive peers can take a while; the registry is already clean.
+            task = asyncio.create_task(self._close_sockets(dead))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def _close_sockets(self, connections: list[Connection]):
+        await asyncio.gather(
+            *(connection.close_with(HEARTBEAT_CLOSE_CODE, HEARTBEAT_CLOSE_REASON) for connection in connections)
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'interval': self.interval,
+            'timeout': self.timeout,
+            'scheduled': len(self.wheel),
+            'pings_sent': self.pings_sent,
+            'reaped': self.reaped,
+            'last_reaped': self.last_reaped,
+            'sweeps': self.sweeps,
+        }
+
+
+heartbeat = Heartbeat()
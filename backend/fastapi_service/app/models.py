@@ -2,14 +2,19 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from .database import Base
 
 
 class Card(Base):
     __tablename__ = 'cards_card'
+    __table_args__ = (
+        Index('cards_card_board_col_rank', 'board_id', 'column', 'rank'),
+        Index('cards_card_search', 'search_vector', postgresql_using='gin'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     board_id = Column(Integer, nullable=False, index=True)
@@ -17,9 +22,19 @@ class Card(Base):
     description = Column(Text, nullable=True)
     position = Column(Integer, default=0)
     column = Column(String(50), nullable=False, default='todo')
+    rank = Column(String(255), nullable=False, default='')
     created_by = Column(Integer, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Generated by Postgres, as declared in the Django migration; only read by search.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple'::regconfig, COALESCE(title, '')), 'A') || "
+            "setweight(to_tsvector('simple'::regconfig, COALESCE(description, '')), 'B')",
+            persisted=True,
+        ),
+    ))
 
     assignments = relationship('CardAssignment', back_populates='card', cascade='all, delete-orphan')
 
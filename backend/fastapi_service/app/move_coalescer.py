@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any
+
+from app import crud
+from app.connections import Connection, manager
+from app.database import run_db
+
+logger = logging.getLogger(__name__)
+
+WS_MOVE_COALESCE_WINDOW = float(os.getenv('WS_MOVE_COALESCE_WINDOW', '0.15'))
+WS_MOVE_RELAY_INTERIM = os.getenv('WS_MOVE_RELAY_INTERIM', 'false').lower() in ('1', 'true', 'yes')
+
+PLACEMENT_FIELDS = ('position',) + crud.ANCHOR_FIELDS
+
+
+class PendingMove:
+    __slots__ = ('fields', 'user_info', 'moves', 'timer')
+
+    def __init__(self, user_info: dict[str, Any]):
+        self.fields: dict[str, Any] = {}
+        self.user_info = user_info
+        self.moves = 0
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class MoveCoalescer:
+    """Collapses rapid card.move actions for the same card into one write and one broadcast.
+
+    The first move of a card opens a window of ``window`` seconds; the card's
+    latest position at the end of the window is persisted and broadcast as
+    ``card.moved``. With ``relay_interim`` each move is also relayed to the
+    other subscribers as an ephemeral ``card.moving`` event.
+    """
+
+    def __init__(self, window: float = WS_MOVE_COALESCE_WINDOW, relay_interim: bool = WS_MOVE_RELAY_INTERIM):
+        self.window = window
+        self.relay_interim = relay_interim
+        self.received = 0
+        self.writes = 0
+        self.relayed = 0
+        # Keyed by board too, so a move of the card from another board's socket cannot redirect a real one.
+        self._pending: dict[tuple[int, int], PendingMove] = {}
+        self._flushing: set[asyncio.Task] = set()
+
+    async def submit(
+        self,
+        board_id: int,
+        card_id: int,
+        fields: dict[str, Any],
+        user_info: dict[str, Any],
+        exclude: Connection | None = None,
+    ):
+        self.received += 1
+        if self.window <= 0:
+            await self._write(board_id, card_id, fields, user_info)
+            return
+
+        key = (board_id, card_id)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = PendingMove(user_info)
+            pending.timer = asyncio.get_running_loop().call_later(self.window, self._expire, key)
+            self._pending[key] = pending
+        if any(name in fields for name in PLACEMENT_FIELDS):
+            # A new target replaces the previous one rather than merging with it.
+            for name in PLACEMENT_FIELDS:
+                pending.fields.pop(name, None)
+        pending.fields.update(fields)
+        pending.user_info = user_info
+        pending.moves += 1
+
+        if self.relay_interim:
+            self.relayed += 1
+            await manager.broadcast(
+                board_id,
+                {'type': 'card.moving', 'data': {'id': card_id, 'board_id': board_id, **fields}, 'user': user_info},
+                exclude=exclude,
+                ephemeral=True,
+            )
+
+    def _expire(self, key: tuple[int, int]):
+        task = asyncio.create_task(self._flush(key))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def flush(self, card_id: int, board_id: int | None = None):
+        """Persist the card's pending move on ``board_id``, or on any board when it is not known."""
+        if board_id is not None:
+            await self._flush((board_id, card_id))
+            return
+        for key in [key for key in self._pending if key[1] == card_id]:
+            await self._flush(key)
+
+    async def _flush(self, key: tuple[int, int]):
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        pending.timer.cancel()
+        board_id, card_id = key
+        try:
+            await self._write(board_id, card_id, pending.fields, pending.user_info)
+        except Exception:
+            logger.exception('Failed to persist coalesced move of card %s', card_id)
+
+    async def flush_board(self, board_id: int):
+        for key in [key for key in self._pending if key[0] == board_id]:
+            await self._flush(key)
+
+    async def flush_all(self):
+        for key in list(self._pending):
+            await self._flush(key)
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+
+    async def _write(self, board_id: int, card_id: int, fields: dict[str, Any], user_info: dict[str, Any]):
+        self.writes += 1
+        card = await run_db(crud.update_card, card_id, fields, board_id)
+        if card:
+            await manager.broadcast(board_id, {'type': 'card.moved', 'data': card, 'user': user_info})
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'window': self.window,
+            'received': self.received,
+            'writes': self.writes,
+            'writes_saved': self.received - self.writes - sum(
+                pending.moves for pending in self._pending.values()
+            ),
+            'relayed': self.relayed,
+            'pending': len(self._pending),
+        }
+
+
+move_coalescer = MoveCoalescer()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any
+
+from app import crud
+from app.connections import manager
+from app.database import run_db
+
+logger = logging.getLogger(__name__)
+
+RANK_REBALANCE_LENGTH = int(os.getenv('RANK_REBALANCE_LENGTH', '12'))
+RANK_REBALANCE_INTERVAL = float(os.getenv('RANK_REBALANCE_INTERVAL', '60'))
+
+RANKED_TYPES = ('card.created', 'card.updated', 'card.moved')
+
+
+class RankRebalancer:
+    """Respaces the ranks of columns whose keys have grown long.
+
+    Columns are noticed from events this replica published, and rewritten
+    every ``interval`` seconds in one transaction broadcast as a batch.
+    """
+
+    def __init__(self, max_length: int = RANK_REBALANCE_LENGTH, interval: float = RANK_REBALANCE_INTERVAL):
+        self.max_length = max_length
+        self.interval = interval
+        self.rebalanced = 0
+        self.cards_reranked = 0
+        self._columns: set[tuple[int, str]] = set()
+        self._task: asyncio.Task | None = None
+
+    async def on_event(self, board_id: int, envelope: dict[str, Any]):
+        if envelope['origin'] != manager.node_id:
+            return
+        message = envelope['message']
+        events = message['data'] if message.get('type') == 'batch' else [message]
+        for event in events:
+            if event.get('type') in RANKED_TYPES and len(event['data']['rank']) > self.max_length:
+                self._columns.add((board_id, event['data']['column']))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.rebalance()
+            except Exception:
+                logger.exception('Rank rebalancing failed')
+
+    async def rebalance(self):
+        columns, self._columns = self._columns, set()
+        for board_id, column in columns:
+            cards = await run_db(crud.rebalance_column, board_id, column)
+            self.rebalanced += 1
+            self.cards_reranked += len(cards)
+            if cards:
+                events = [{'type': 'card.updated', 'data': card} for card in cards]
+                await manager.broadcast(board_id, {'type': 'batch', 'data': events})
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'pending_columns': len(self._columns),
+            'rebalanced': self.rebalanced,
+            'cards_reranked': self.cards_reranked,
+        }
+
+
+rank_rebalancer = RankRebalancer()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+# Ranks are base-36 fractions written without the leading "0.": they order
+# lexicographically, never end in "0", and a new one fits between any two.
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+_DIGIT_SET = frozenset(DIGITS)
+
+
+def _midpoint(lower: str, upper: str | None) -> str:
+    if upper is not None:
+        common = 0
+        while common < len(upper) and (lower[common] if common < len(lower) else '0') == upper[common]:
+            common += 1
+        if common:
+            return upper[:common] + _midpoint(lower[common:], upper[common:])
+
+    digit_lower = DIGITS.index(lower[0]) if lower else 0
+    digit_upper = DIGITS.index(upper[0]) if upper is not None else BASE
+    if digit_upper - digit_lower > 1:
+        # Step by one digit at either open end, so keys grow slowly under
+        # repeated appends or prepends; split the gap otherwise.
+        if upper is None and lower:
+            return DIGITS[digit_lower + 1]
+        if upper is not None and not lower:
+            return DIGITS[digit_upper - 1]
+        return DIGITS[(digit_lower + digit_upper) // 2]
+    if upper is not None and len(upper) > 1:
+        return upper[0]
+    return DIGITS[digit_lower] + _midpoint(lower[1:], None)
+
+
+def rank_between(lower: str | None, upper: str | None) -> str:
+    """A rank sorting strictly between ``lower`` and ``upper``; None means unbounded."""
+    lower = lower or ''
+    if upper is not None and lower >= upper:
+        raise ValueError(f'Cannot rank between {lower!r} and {upper!r}')
+    return _midpoint(lower, upper)
+
+
+def spread(count: int) -> list[str]:
+    """``count`` evenly spaced ranks of equal length, leaving room between neighbours."""
+    width = 1
+    while BASE ** width < (count + 1) * BASE:
+        width += 1
+    step = BASE ** width // (count + 1)
+    ranks = []
+    for index in range(1, count + 1):
+        value = step * index
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        ranks.append(''.join(reversed(digits)).rstrip('0'))
+    return ranks
+
+
+def ranks_between(lower: str | None, upper: str | None, count: int) -> list[str]:
+    """``count`` ascending ranks between ``lower`` and ``upper``, kept short by bisecting the gap."""
+    if count <= 0:
+        return []
+    middle = count // 2
+    rank = rank_between(lower, upper)
+    return ranks_between(lower, rank, middle) + [rank] + ranks_between(rank, upper, count - middle - 1)
+
+
+def is_rank(value: str) -> bool:
+    return bool(value) and value[-1] != '0' and _DIGIT_SET.issuperset(value)
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any
+
+from app.connections import Connection
+from app.encoding import ACTIONS, Frame
+
+# Tokens refilled per second and bucket size for each scope; a rate of 0 turns that scope off.
+WS_RATE_CONNECTION_RATE = float(os.getenv('WS_RATE_CONNECTION_RATE', '20'))
+WS_RATE_CONNECTION_BURST = float(os.getenv('WS_RATE_CONNECTION_BURST', '40'))
+WS_RATE_USER_RATE = float(os.getenv('WS_RATE_USER_RATE', '40'))
+WS_RATE_USER_BURST = float(os.getenv('WS_RATE_USER_BURST', '80'))
+WS_RATE_BOARD_RATE = float(os.getenv('WS_RATE_BOARD_RATE', '200'))
+WS_RATE_BOARD_BURST = float(os.getenv('WS_RATE_BOARD_BURST', '400'))
+# A message short of tokens waits up to this many seconds for them before it is rejected.
+WS_RATE_MAX_DELAY = float(os.getenv('WS_RATE_MAX_DELAY', '0.5'))
+
+SCOPES = ('connection', 'user', 'board')
+
+# Heartbeat replies are never limited, so a throttled client is not also reaped.
+EXEMPT_ACTIONS = ('pong',)
+
+# Buckets idle this long have refilled and are dropped.
+PRUNE_INTERVAL = 60.0
+
+
+class TokenBucket:
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated = now
+
+    def refill(self, rate: float, burst: float, now: float) -> float:
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        return self.tokens
+
+
+class _Scope:
+    __slots__ = ('name', 'rate', 'burst', 'buckets', 'rejected')
+
+    def __init__(self, name: str, rate: float, burst: float):
+        if rate > 0 and burst < 1:
+            raise ValueError(f'Rate limit burst for {name} must be at least 1')
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.buckets: dict[int, TokenBucket] = {}
+        self.rejected = 0
+
+    def bucket(self, key: int, now: float) -> TokenBucket:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(self.burst, now)
+        return bucket
+
+    def prune(self, now: float):
+        full = now - self.burst / self.rate
+        self.buckets = {key: bucket for key, bucket in self.buckets.items() if bucket.updated > full}
+
+
+class RateLimiter:
+    """Token buckets for WebSocket actions per connection, per user and per board.
+
+    A message takes ``cost`` tokens (one, or one per operation of a batch)
+    from each scope's bucket, and only when all of them have enough, so a
+    rejected message costs nothing. A message costing more than a bucket
+    holds is rejected at once. Limits are enforced by each replica on the
+    connections it serves.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, tuple[float, float]] | None = None,
+        max_delay: float = WS_RATE_MAX_DELAY,
+    ):
+        limits = limits or {
+            'connection': (WS_RATE_CONNECTION_RATE, WS_RATE_CONNECTION_BURST),
+            'user': (WS_RATE_USER_RATE, WS_RATE_USER_BURST),
+            'board': (WS_RATE_BOARD_RATE, WS_RATE_BOARD_BURST),
+        }
+        self.scopes = [_Scope(name, *limits[name]) for name in SCOPES if limits[name][0] > 0]
+        self.max_delay = max_delay
+        self.admitted = 0
+        self.deferred = 0
+        self.deferred_seconds = 0.0
+        self.rejected_actions: dict[str, int] = {}
+        self._pruned_at = time.monotonic()
+
+    def _keys(self, connection: Connection) -> dict[str, int]:
+        return {'connection': connection.id, 'user': connection.user_id, 'board': connection.board_id}
+
+    def _try_take(self, keys: dict[str, int], cost: float) -> tuple[_Scope | None, float]:
+        """Take ``cost`` tokens from every bucket, or return the scope that is short and how long until it refills."""
+        now = time.monotonic()
+        if now - self._pruned_at >= PRUNE_INTERVAL:
+            for scope in self.scopes:
+                scope.prune(now)
+            self._pruned_at = now
+
+        buckets = []
+        for scope in self.scopes:
+            bucket = scope.bucket(keys[scope.name], now)
+            tokens = bucket.refill(scope.rate, scope.burst, now)
+            if tokens < cost:
+                return scope, (cost - tokens) / scope.rate
+            buckets.append(bucket)
+        for bucket in buckets:
+            bucket.tokens -= cost
+        return None, 0.0
+
+    async def admit(self, connection: Connection, action: Any, cost: int = 1) -> bool:
+        """Wait up to ``max_delay`` for tokens; False, after telling the client, if they do not come."""
+        if action in EXEMPT_ACTIONS:
+            return True
+        oversized = next((scope for scope in self.scopes if cost > scope.burst), None)
+        if oversized is not None:
+            # No amount of waiting fills a bucket past its burst.
+            return self._reject(connection, action, oversized, None, cost)
+
+        keys = self._keys(connection)
+        started = time.monotonic()
+        scope, retry_after = self._try_take(keys, cost)
+        waited = False
+        if scope is not None and retry_after <= self.max_delay:
+            deadline = started + self.max_delay
+            waited = True
+            # Other connections of the same user or board may take the refilled tokens first.
+            while scope is not None and time.monotonic() + retry_after <= deadline:
+                await asyncio.sleep(retry_after)
+                scope, retry_after = self._try_take(keys, cost)
+
+        if scope is None:
+            self.admitted += 1
+            if waited:
+                self.deferred += 1
+                self.deferred_seconds += time.monotonic() - started
+            return True
+        return self._reject(connection, action, scope, retry_after, cost)
+
+    def _reject(
+        self,
+        connection: Connection,
+        action: Any,
+        scope: _Scope,
+        retry_after: float | None,
+        cost: int,
+    ) -> bool:
+        """Count the rejection and tell the client; ``retry_after`` is None when waiting cannot help."""
+        scope.rejected += 1
+        name = action if action in ACTIONS else 'unknown'
+        self.rejected_actions[name] = self.rejected_actions.get(name, 0) + 1
+        connection.enqueue(Frame({
+            'type': 'rate_limited',
+            'data': {
+                'action': name,
+                'scope': scope.name,
+                'retry_after': None if retry_after is None else round(retry_after, 3),
+                'cost': cost,
+                'rate': scope.rate,
+                'burst': scope.burst,
+            },
+        }))
+        return False
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'admitted': self.admitted,
+            'deferred': self.deferred,
+            'deferred_seconds': round(self.deferred_seconds, 3),
+            'rejected': {scope.name: scope.rejected for scope in self.scopes},
+            'rejected_actions': dict(self.rejected_actions),
+            'limits': {scope.name: {'rate': scope.rate, 'burst': scope.burst} for scope in self.scopes},
+            'buckets': {scope.name: len(scope.buckets) for scope in self.scopes},
+        }
+
+
+rate_limiter = RateLimiter()
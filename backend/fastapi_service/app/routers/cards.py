@@ -1,149 +1,459 @@
 from __future__ import annotations
 
+import base64
+import functools
+import os
+import time
+from email.utils import formatdate, parsedate_to_datetime
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 
-from app.database import get_db
-from app.dependencies import get_current_user
-from app.models import Card, CardAssignment
-from app.schemas.card import AssignUserRequest, CardCreate, CardResponse, CardUpdate
+from app import crud
+from app.board_access import BoardGrant
+from app.connections import manager
+from app.database import run_db, stream_db
+from app.dependencies import get_board_grant, get_current_user
+from app.encoding import decode, encode
+from app.event_log import event_log
+from app.move_coalescer import move_coalescer
+from app.search_index import SEARCH_BACKEND, search_index, tokenize
+from app.schemas.card import (
+    AssignUserRequest,
+    BulkCardCreate,
+    BulkCardDelete,
+    BulkCardMove,
+    BulkCardPatch,
+    BulkResponse,
+    CardCreate,
+    CardImport,
+    CardResponse,
+    CardUpdate,
+)
+from app.snapshot_cache import snapshot_cache
 
 router = APIRouter()
 
+CARDS_PAGE_SIZE = int(os.getenv('CARDS_PAGE_SIZE', '100'))
+CARDS_PAGE_MAX_SIZE = int(os.getenv('CARDS_PAGE_MAX_SIZE', '500'))
+CARDS_BULK_MAX_ITEMS = int(os.getenv('CARDS_BULK_MAX_ITEMS', '1000'))
+CARDS_EXPORT_CHUNK_SIZE = int(os.getenv('CARDS_EXPORT_CHUNK_SIZE', '500'))
+CARDS_IMPORT_BATCH_SIZE = int(os.getenv('CARDS_IMPORT_BATCH_SIZE', '500'))
+CARDS_SEARCH_LIMIT = int(os.getenv('CARDS_SEARCH_LIMIT', '20'))
+CARDS_SEARCH_MAX_LIMIT = int(os.getenv('CARDS_SEARCH_MAX_LIMIT', '100'))
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+IMPORT_MAX_LINE_BYTES = 1 << 20
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+# Shared caches may keep card responses but must revalidate every use, which re-checks access here.
+CARDS_CACHE_CONTROL = 'public, no-cache'
+
+
+def _encode_cursor(card: dict[str, Any]) -> str:
+    key = encode([card['column'], card['rank'], card['id']])
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str, int]:
+    try:
+        column, rank, card_id = decode(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid cursor')
+    if not (isinstance(column, str) and isinstance(rank, str) and isinstance(card_id, int)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid cursor')
+    return column, rank, card_id
+
+
+def _etag(board_id: int, seq: int) -> str:
+    return f'W/"{board_id}.{seq}"'
+
+
+def _if_none_match(request: Request) -> list[str] | None:
+    header = request.headers.get('if-none-match')
+    if header is None:
+        return None
+    # Weak comparison: W/"x" and "x" name the same version.
+    return [tag.strip().removeprefix('W/') for tag in header.split(',')]
+
+
+def _tagged_version(tag: str) -> tuple[int, int] | None:
+    try:
+        board_id, seq = tag.strip('"').split('.')
+        return int(board_id), int(seq)
+    except ValueError:
+        return None
+
+
+def _validators(board_id: int, seq: int) -> dict[str, str]:
+    """Response headers identifying the cards of ``board_id`` as of its event ``seq``."""
+    headers = {'ETag': _etag(board_id, seq), 'Cache-Control': CARDS_CACHE_CONTROL}
+    modified_at = event_log.modified_at(board_id)
+    # Last-Modified has one-second resolution, so it is only sent once its second is over;
+    # otherwise a later change in the same second would look unmodified.
+    if int(modified_at) < int(time.time()):
+        headers['Last-Modified'] = formatdate(modified_at, usegmt=True)
+    return headers
+
+
+def _is_current(request: Request, board_id: int, seq: int) -> bool:
+    tags = _if_none_match(request)
+    if tags is not None:
+        return '*' in tags or _etag(board_id, seq).removeprefix('W/') in tags
+    since = request.headers.get('if-modified-since')
+    if since is None:
+        return False
+    try:
+        since_at = parsedate_to_datetime(since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(event_log.modified_at(board_id)) <= since_at
+
+
+def _conditional(request: Request, response: Response, board_id: int, seq: int) -> Response | None:
+    """Set validators for the board's cards; a 304 if the client already has this version."""
+    headers = _validators(board_id, seq)
+    if _is_current(request, board_id, seq):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def _check_board(grant: BoardGrant | None, board_id: int):
+    if grant is not None and grant.board_id != board_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Board access grant is for another board')
+
+
+def _granted_board(grant: BoardGrant | None) -> int | None:
+    # Card ids are looked up within the granted board, so other boards' cards read as missing.
+    return grant.board_id if grant is not None else None
+
 
 @router.get('/boards/{board_id}/cards', response_model=list[CardResponse])
-def list_cards(
+async def list_cards(
     board_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=CARDS_PAGE_MAX_SIZE),
+    cursor: str | None = None,
     current_user: dict[str, Any] = Depends(get_current_user),
-) -> list[Card]:
-    cards = db.query(Card).filter(Card.board_id == board_id).all()
-    for card in cards:
-        card.assigned_to = card.assignments
+    grant: BoardGrant | None = Depends(get_board_grant),
+) -> list[dict[str, Any]] | Response:
+    _check_board(grant, board_id)
+    # Read before the cards, so a change racing the read can only make the version look older.
+    seq = event_log.position(board_id)
+    not_modified = _conditional(request, response, board_id, seq)
+    if not_modified is not None:
+        return not_modified
+
+    if limit is None and cursor is None:
+        snapshot = await snapshot_cache.get(board_id, seq, functools.partial(run_db, crud.list_cards, board_id))
+        return snapshot.card_list()
+
+    # Paged reads go to the database; the next page starts after the last card returned.
+    limit = limit or CARDS_PAGE_SIZE
+    after = _decode_cursor(cursor) if cursor else None
+    cards = await run_db(crud.list_cards, board_id, after, limit + 1)
+    if len(cards) > limit:
+        cards = cards[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = _encode_cursor(cards[-1])
     return cards
 
 
+@router.get('/boards/{board_id}/cards/search', response_model=list[CardResponse])
+async def search_cards(
+    board_id: int,
+    q: str,
+    limit: int = Query(CARDS_SEARCH_LIMIT, ge=1, le=CARDS_SEARCH_MAX_LIMIT),
+    current_user: dict[str, Any] = Depends(get_current_user),
+    grant: BoardGrant | None = Depends(get_board_grant),
+) -> list[dict[str, Any]]:
+    _check_board(grant, board_id)
+    tokens = tokenize(q)
+    if not tokens:
+        return []
+    if SEARCH_BACKEND == 'postgres':
+        return await run_db(crud.search_cards, board_id, tokens, limit)
+
+    async def load():
+        snapshot = await snapshot_cache.get(
+            board_id, event_log.position(board_id), functools.partial(run_db, crud.list_cards, board_id)
+        )
+        return snapshot.cards.values(), [frame.message for frame in event_log.replay(board_id, snapshot.seq)]
+
+    return await search_index.search(board_id, tokens, limit, load)
+
+
 @router.post('/boards/{board_id}/cards', response_model=CardResponse, status_code=status.HTTP_201_CREATED)
-def create_card(
+async def create_card(
     board_id: int,
     card_data: CardCreate,
-    db: Session = Depends(get_db),
     current_user: dict[str, Any] = Depends(get_current_user),
-) -> Card:
-    card = Card(
-        board_id=board_id,
-        title=card_data.title,
-        description=card_data.description,
-        column=card_data.column,
-        position=card_data.position,
-        created_by=current_user['user_id'],
-    )
-    db.add(card)
-    db.commit()
-    db.refresh(card)
-    card.assigned_to = []
+    grant: BoardGrant | None = Depends(get_board_grant),
+) -> dict[str, Any]:
+    _check_board(grant, board_id)
+    card = await run_db(crud.create_card, board_id, current_user['user_id'], card_data.model_dump(exclude_unset=True))
+    await manager.broadcast(board_id, {'type': 'card.created', 'data': card, 'user': current_user})
     return card
 
 
 @router.get('/cards/{card_id}', response_model=CardResponse)
-def get_card(
+async def get_card(
     card_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
     current_user: dict[str, Any] = Depends(get_current_user),
-) -> Card:
-    card = db.query(Card).filter(Card.id == card_id).first()
+    grant: BoardGrant | None = Depends(get_board_grant),
+) -> dict[str, Any] | Response:
+    # A card's ETag names its board's version, so an unchanged board answers 304 without a query.
+    for tag in _if_none_match(request) or []:
+        version = _tagged_version(tag)
+        if version is None or (grant is not None and version[0] != grant.board_id):
+            continue
+        if event_log.position(version[0]) == version[1]:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_validators(*version))
+
+    last_seq = event_log.last_seq
+    card = await run_db(crud.get_card, card_id, _granted_board(grant))
     if not card:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Card not found')
-    card.assigned_to = card.assignments
+    seq = event_log.position(card['board_id'])
+    # Otherwise the board changed during the read, and the card may predate that version.
+    if seq <= last_seq:
+        not_modified = _conditional(request, response, card['board_id'], seq)
+        if not_modified is not None:
+            return not_modified
     return card
 
 
 @router.patch('/cards/{card_id}', response_model=CardResponse)
-def update_card(
+async def update_card(
     card_id: int,
     card_data: CardUpdate,
-    db: Session = Depends(get_db),
     current_user: dict[str, Any] = Depends(get_current_user),
-) -> Card:
-    card = db.query(Card).filter(Card.id == card_id).first()
+    grant: BoardGrant | None = Depends(get_board_grant),
+) -> dict[str, Any]:
+    await move_coalescer.flush(card_id, _granted_board(grant))
+    card = await run_db(crud.update_card, card_id, card_data.model_dump(exclude_none=True), _granted_board(grant))
     if not card:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Card not found')
-
-    if card_data.title is not None:
-        card.title = card_data.title
-    if card_data.description is not None:
-        card.description = card_data.description
-    if card_data.column is not None:
-        card.column = card_data.column
-    if card_data.position is not None:
-        card.position = card_data.position
-
-    db.commit()
-    db.refresh(card)
-    card.assigned_to = card.assignments
+    await manager.broadcast(card['board_id'], {'type': 'card.updated', 'data': card, 'user': current_user})
     return card
 
 
 @router.delete('/cards/{card_id}', status_code=status.HTTP_204_NO_CONTENT)
-def delete_card(
+async def delete_card(
     card_id: int,
-    db: Session = Depends(get_db),
     current_user: dict[str, Any] = Depends(get_current_user),
+    grant: BoardGrant | None = Depends(get_board_grant),
 ):
-    card = db.query(Card).filter(Card.id == card_id).first()
-    if not card:
+    await move_coalescer.flush(card_id, _granted_board(grant))
+    deleted = await run_db(crud.delete_card, card_id, _granted_board(grant))
+    if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Card not found')
-    db.delete(card)
-    db.commit()
+    await manager.broadcast(deleted['board_id'], {'type': 'card.deleted', 'data': deleted, 'user': current_user})
     return None
 
 
 @router.post('/cards/{card_id}/assign', status_code=status.HTTP_201_CREATED)
-def assign_user_to_card(
+async def assign_user_to_card(
     card_id: int,
     request: AssignUserRequest,
-    db: Session = Depends(get_db),
     current_user: dict[str, Any] = Depends(get_current_user),
+    grant: BoardGrant | None = Depends(get_board_grant),
 ) -> dict[str, str]:
-    card = db.query(Card).filter(Card.id == card_id).first()
-    if not card:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Card not found')
-
-    existing = db.query(CardAssignment).filter(
-        CardAssignment.card_id == card_id,
-        CardAssignment.user_id == request.user_id
-    ).first()
-
-    if existing:
+    try:
+        card = await run_db(crud.assign_user, card_id, request.user_id, _granted_board(grant))
+    except crud.AssignmentExistsError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='User already assigned to this card'
         )
-
-    assignment = CardAssignment(card_id=card_id, user_id=request.user_id)
-    db.add(assignment)
-    db.commit()
+    if not card:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Card not found')
+    await manager.broadcast(card['board_id'], {'type': 'card.updated', 'data': card, 'user': current_user})
 
     return {'message': 'User assigned successfully'}
 
 
 @router.delete('/cards/{card_id}/assign/{user_id}', status_code=status.HTTP_204_NO_CONTENT)
-def unassign_user_from_card(
+async def unassign_user_from_card(
     card_id: int,
     user_id: int,
-    db: Session = Depends(get_db),
     current_user: dict[str, Any] = Depends(get_current_user),
+    grant: BoardGrant | None = Depends(get_board_grant),
 ):
-    assignment = db.query(CardAssignment).filter(
-        CardAssignment.card_id == card_id,
-        CardAssignment.user_id == user_id
-    ).first()
-
-    if not assignment:
+    card = await run_db(crud.unassign_user, card_id, user_id, _granted_board(grant))
+    if not card:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Assignment not found')
-
-    db.delete(assignment)
-    db.commit()
+    await manager.broadcast(card['board_id'], {'type': 'card.updated', 'data': card, 'user': current_user})
     return None
+
+
+def _check_bulk_size(items: list[Any]):
+    if len(items) > CARDS_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'At most {CARDS_BULK_MAX_ITEMS} cards per bulk request',
+        )
+
+
+def _bulk_results(ids: list[int], cards: dict[int, Any], found_status: int) -> dict[str, Any]:
+    return {'results': [
+        {'id': card_id, 'status': found_status, 'card': cards[card_id]} if card_id in cards
+        else {'id': card_id, 'status': status.HTTP_404_NOT_FOUND, 'detail': 'Card not found'}
+        for card_id in ids
+    ]}
+
+
+async def _broadcast_bulk(board_id: int, event_type: str, items: list[dict[str, Any]], user: dict[str, Any]):
+    # One batch message, as for a WebSocket batch action.
+    if items:
+        events = [{'type': event_type, 'data': data} for data in items]
+        await manager.broadcast(board_id, {'type': 'batch', 'data': events, 'user': user})
+
+
+@router.post(
+    '/boards/{board_id}/cards/bulk',
+    response_model=BulkResponse,
+    response_model_exclude_none=True,
+    status_code=status.HTTP_201_CREATED,
+)
+async def bulk_create_cards(
+    board_id: int,
+    payload: BulkCardCreate,
+    current_user: dict[str, Any] = Depends(get_current_user),
+    grant: BoardGrant | None = Depends(get_board_grant),
+) -> dict[str, Any]:
+    _check_board(grant, board_id)
+    _check_bulk_size(payload.cards)
+    cards = await run_db(
+        crud.bulk_create_cards, board_id, current_user['user_id'], [card.model_dump() for card in payload.cards]
+    )
+    await _broadcast_bulk(board_id, 'card.created', cards, current_user)
+    return {'results': [{'id': card['id'], 'status': status.HTTP_201_CREATED, 'card': card} for card in cards]}
+
+
+@router.patch('/boards/{board_id}/cards/bulk', response_model=BulkResponse, response_model_exclude_none=True)
+async def bulk_update_cards(
+    board_id: int,
+    payload: BulkCardPatch,
+    current_user: dict[str, Any] = Depends(get_current_user),
+    grant: BoardGrant | None = Depends(get_board_grant),
+) -> dict[str, Any]:
+    _check_board(grant, board_id)
+    _check_bulk_size(payload.cards)
+    await move_coalescer.flush_board(board_id)
+    cards = await run_db(
+        crud.bulk_update_cards, board_id, [item.model_dump(exclude_none=True) for item in payload.cards]
+    )
+    await _broadcast_bulk(board_id, 'card.updated', list(cards.values()), current_user)
+    return _bulk_results([item.id for item in payload.cards], cards, status.HTTP_200_OK)
+
+
+@router.post('/boards/{board_id}/cards/bulk/move', response_model=BulkResponse, response_model_exclude_none=True)
+async def bulk_move_cards(
+    board_id: int,
+    payload: BulkCardMove,
+    current_user: dict[str, Any] = Depends(get_current_user),
+    grant: BoardGrant | None = Depends(get_board_grant),
+) -> dict[str, Any]:
+    _check_board(grant, board_id)
+    _check_bulk_size(payload.cards)
+    await move_coalescer.flush_board(board_id)
+    cards = await run_db(
+        crud.bulk_move_cards, board_id, [item.model_dump(exclude_none=True) for item in payload.cards]
+    )
+    await _broadcast_bulk(board_id, 'card.moved', list(cards.values()), current_user)
+    return _bulk_results([item.id for item in payload.cards], cards, status.HTTP_200_OK)
+
+
+@router.post('/boards/{board_id}/cards/bulk/delete', response_model=BulkResponse, response_model_exclude_none=True)
+async def bulk_delete_cards(
+    board_id: int,
+    payload: BulkCardDelete,
+    current_user: dict[str, Any] = Depends(get_current_user),
+    grant: BoardGrant | None = Depends(get_board_grant),
+) -> dict[str, Any]:
+    _check_board(grant, board_id)
+    _check_bulk_size(payload.ids)
+    await move_coalescer.flush_board(board_id)
+    deleted = await run_db(crud.bulk_delete_cards, board_id, payload.ids)
+    await _broadcast_bulk(
+        board_id, 'card.deleted', [{'id': card_id, 'board_id': board_id} for card_id in deleted], current_user
+    )
+    return _bulk_results(payload.ids, {card_id: None for card_id in deleted}, status.HTTP_204_NO_CONTENT)
+
+
+@router.get('/boards/{board_id}/cards/export')
+async def export_cards(
+    board_id: int,
+    current_user: dict[str, Any] = Depends(get_current_user),
+    grant: BoardGrant | None = Depends(get_board_grant),
+) -> StreamingResponse:
+    _check_board(grant, board_id)
+    return StreamingResponse(
+        stream_db(crud.export_cards, board_id, CARDS_EXPORT_CHUNK_SIZE),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={'Content-Disposition': f'attachment; filename="board-{board_id}-cards.ndjson"'},
+    )
+
+
+@router.post('/boards/{board_id}/cards/import', status_code=status.HTTP_201_CREATED)
+async def import_cards(
+    board_id: int,
+    request: Request,
+    current_user: dict[str, Any] = Depends(get_current_user),
+    grant: BoardGrant | None = Depends(get_board_grant),
+) -> dict[str, int]:
+    """Import NDJSON cards as they arrive, committing every CARDS_IMPORT_BATCH_SIZE cards.
+
+    A bad line stops the import; the batches before it stay imported.
+    """
+    _check_board(grant, board_id)
+    counts = {'imported': 0, 'assignments': 0}
+    batch: list[dict[str, Any]] = []
+
+    async def flush():
+        if not batch:
+            return
+        cards = await run_db(crud.import_cards, board_id, current_user['user_id'], batch)
+        batch.clear()
+        counts['imported'] += len(cards)
+        counts['assignments'] += sum(len(card['assigned_to']) for card in cards)
+        await _broadcast_bulk(board_id, 'card.created', cards, current_user)
+
+    def reject(line_number: int, error: str):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={'line': line_number, 'error': error, **counts},
+        )
+
+    line_number = 0
+
+    async def take(line: bytes):
+        nonlocal line_number
+        line_number += 1
+        if not line.strip():
+            return
+        try:
+            batch.append(CardImport.model_validate_json(line).model_dump(exclude_none=True))
+        except ValidationError as e:
+            reject(line_number, str(e.errors(include_url=False)[0]['msg']))
+        if len(batch) >= CARDS_IMPORT_BATCH_SIZE:
+            await flush()
+
+    buffer = b''
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            await take(line)
+        if len(buffer) > IMPORT_MAX_LINE_BYTES:
+            reject(line_number + 1, f'Line longer than {IMPORT_MAX_LINE_BYTES} bytes')
+    await take(buffer)
+    await flush()
+    return counts
@@ -1,59 +1,30 @@
 from __future__ import annotations
 
-import json
+import functools
 import os
 from typing import Any
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
 
-from app.database import SessionLocal
-from app.models import Card, CardAssignment
+from app import crud
+from app.board_access import board_access
+from app.connections import Connection, manager
+from app.database import run_db
+from app.encoding import MSGPACK_SUBPROTOCOL, Frame, decode, unpack
+from app.event_log import event_log
+from app.heartbeat import heartbeat
+from app.move_coalescer import move_coalescer
+from app.rate_limit import rate_limiter
+from app.snapshot_cache import snapshot_cache
 
 router = APIRouter()
 
 JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key-here')
 JWT_ALGORITHM = 'HS256'
+WS_BATCH_MAX_OPERATIONS = int(os.getenv('WS_BATCH_MAX_OPERATIONS', '500'))
 
-
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: dict[int, list[tuple[WebSocket, dict[str, Any]]]] = {}
-
-    async def connect(self, websocket: WebSocket, board_id: int, user_info: dict[str, Any]):
-        await websocket.accept()
-        if board_id not in self.active_connections:
-            self.active_connections[board_id] = []
-        self.active_connections[board_id].append((websocket, user_info))
-
-    def disconnect(self, websocket: WebSocket, board_id: int):
-        if board_id in self.active_connections:
-            self.active_connections[board_id] = [
-                (conn, user) for conn, user in self.active_connections[board_id]
-                if conn != websocket
-            ]
-            if not self.active_connections[board_id]:
-                del self.active_connections[board_id]
-
-    async def broadcast(self, board_id: int, message: dict[str, Any], exclude: WebSocket | None = None):
-        if board_id not in self.active_connections:
-            return
-
-        disconnected = []
-        for websocket, _ in self.active_connections[board_id]:
-            if exclude and websocket == exclude:
-                continue
-            try:
-                await websocket.send_json(message)
-            except Exception:
-                disconnected.append(websocket)
-
-        for websocket in disconnected:
-            self.disconnect(websocket, board_id)
-
-
-manager = ConnectionManager()
+CARD_ACTIONS = ('card.create', 'card.update', 'card.move', 'card.delete')
 
 
 def _validate_token(token: str) -> dict[str, Any] | None:
@@ -67,24 +38,68 @@ def _validate_token(token: str) -> dict[str, Any] | None:
         return None
 
 
-def _get_card_data(card: Card, db: Session) -> dict[str, Any]:
-    assignments = db.query(CardAssignment).filter(CardAssignment.card_id == card.id).all()
-    return {
-        'id': card.id,
-        'board_id': card.board_id,
-        'title': card.title,
-        'description': card.description,
-        'column': card.column,
-        'position': card.position,
-        'created_by': card.created_by,
-        'created_at': card.created_at.isoformat(),
-        'updated_at': card.updated_at.isoformat(),
-        'assigned_to': [{'id': a.id, 'user_id': a.user_id} for a in assignments],
-    }
+def _reject(connection: Connection, action: Any, detail: str):
+    connection.enqueue(Frame({'type': 'error', 'data': {'action': action, 'detail': detail}}))
+
+
+async def _sync_connection(connection: Connection, board_id: int, since: int | None):
+    if since is not None:
+        missed = event_log.since(board_id, since)
+        if missed is not None:
+            connection.enqueue(Frame({
+                'type': 'resync',
+                'data': [frame.message for frame in missed],
+                'seq': event_log.position(board_id),
+            }))
+            return
+
+    snapshot = await snapshot_cache.get(
+        board_id, event_log.position(board_id), functools.partial(run_db, crud.list_cards, board_id)
+    )
+    if snapshot.frame is None:
+        snapshot.frame = Frame({
+            'type': 'initial_state',
+            'data': snapshot.card_list(),
+            'seq': snapshot.seq,
+        })
+    connection.enqueue(snapshot.frame)
+    # Replay anything the snapshot may predate, less creates of cards it already holds.
+    for frame in event_log.replay(board_id, snapshot.seq):
+        frame = _unreflected(frame, snapshot.cards)
+        if frame is not None:
+            connection.enqueue(frame)
+
+
+def _unreflected(frame: Frame, cards: dict[int, Any]) -> Frame | None:
+    """The part of a replayed frame the snapshot does not show, or None.
+
+    The snapshot is read after its seq is taken, so it may already hold cards
+    whose card.created is replayed, and clients append created cards without
+    checking for them. Updates, moves and deletes carry the card's state and
+    are safe to apply again.
+    """
+    message = frame.message
+    if message['type'] == 'card.created':
+        return None if message['data']['id'] in cards else frame
+    if message['type'] != 'batch':
+        return frame
+    events = [
+        event for event in message['data']
+        if not (event['type'] == 'card.created' and event['data']['id'] in cards)
+    ]
+    if len(events) == len(message['data']):
+        return frame
+    return Frame({**message, 'data': events}) if events else None
 
 
 @router.websocket('/boards/{board_id}')
-async def websocket_endpoint(websocket: WebSocket, board_id: int, token: str = None):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    board_id: int,
+    token: str = None,
+    since: int | None = None,
+    grant: str | None = None,
+):
     if not token:
         await websocket.close(code=1008, reason='Missing token')
         return
@@ -94,39 +109,44 @@ async def websocket_endpoint(websocket: WebSocket, board_id: int, token: str = N
         await websocket.close(code=1008, reason='Invalid token')
         return
 
-    await manager.connect(websocket, board_id, user_info)
+    board_grant = None
+    if board_access.required:
+        board_grant = board_access.verify(grant, user_info['user_id'], board_id) if grant else None
+        if board_grant is None:
+            await websocket.close(code=1008, reason='Board access denied')
+            return
+
+    # JSON text frames unless the client offers the MessagePack subprotocol.
+    subprotocol = MSGPACK_SUBPROTOCOL if MSGPACK_SUBPROTOCOL in websocket.scope.get('subprotocols', ()) else None
+    connection = await manager.connect(websocket, board_id, user_info, board_grant, subprotocol)
+    heartbeat.track(connection)
 
-    db: Session = SessionLocal()
     try:
-        cards = db.query(Card).filter(Card.board_id == board_id).all()
-        initial_data = {
-            'type': 'initial_state',
-            'data': [_get_card_data(card, db) for card in cards],
-        }
-        await websocket.send_json(initial_data)
+        await _sync_connection(connection, board_id, since)
 
         while True:
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            if connection.binary:
+                message = unpack(await websocket.receive_bytes())
+            else:
+                message = decode(await websocket.receive_text())
+            # Every message, a pong included, shows the client is alive.
+            connection.touch()
             action = message.get('action')
             card_data = message.get('data', {})
+            # A batch is charged per operation, so it cannot multiply a client's write rate.
+            cost = max(len(card_data), 1) if action == 'batch' and isinstance(card_data, list) else 1
+            if not await rate_limiter.admit(connection, action, cost):
+                continue
+            if action in CARD_ACTIONS and not isinstance(card_data, dict):
+                _reject(connection, action, 'Expected data to be an object')
+                continue
 
             if action == 'card.create':
-                card = Card(
-                    board_id=board_id,
-                    title=card_data.get('title', 'Untitled'),
-                    description=card_data.get('description'),
-                    column=card_data.get('column', 'todo'),
-                    position=card_data.get('position', 0),
-                    created_by=user_info['user_id'],
-                )
-                db.add(card)
-                db.commit()
-                db.refresh(card)
+                card = await run_db(crud.create_card, board_id, user_info['user_id'], card_data)
 
                 response = {
                     'type': 'card.created',
-                    'data': _get_card_data(card, db),
+                    'data': card,
                     'user': user_info,
                 }
                 await manager.broadcast(board_id, response)
@@ -134,23 +154,13 @@ async def websocket_endpoint(websocket: WebSocket, board_id: int, token: str = N
             elif action == 'card.update':
                 card_id = card_data.get('id')
                 if card_id:
-                    card = db.query(Card).filter(Card.id == card_id).first()
+                    await move_coalescer.flush(card_id, board_id)
+                    fields = {name: card_data[name] for name in crud.EDIT_FIELDS if name in card_data}
+                    card = await run_db(crud.update_card, card_id, fields, board_id)
                     if card:
-                        if 'title' in card_data:
-                            card.title = card_data['title']
-                        if 'description' in card_data:
-                            card.description = card_data['description']
-                        if 'column' in card_data:
-                            card.column = card_data['column']
-                        if 'position' in card_data:
-                            card.position = card_data['position']
-
-                        db.commit()
-                        db.refresh(card)
-
                         response = {
                             'type': 'card.updated',
-                            'data': _get_card_data(card, db),
+                            'data': card,
                             'user': user_info,
                         }
                         await manager.broadcast(board_id, response)
@@ -158,42 +168,41 @@ async def websocket_endpoint(websocket: WebSocket, board_id: int, token: str = N
             elif action == 'card.move':
                 card_id = card_data.get('id')
                 if card_id:
-                    card = db.query(Card).filter(Card.id == card_id).first()
-                    if card:
-                        if 'column' in card_data:
-                            card.column = card_data['column']
-                        if 'position' in card_data:
-                            card.position = card_data['position']
-
-                        db.commit()
-                        db.refresh(card)
-
-                        response = {
-                            'type': 'card.moved',
-                            'data': _get_card_data(card, db),
-                            'user': user_info,
-                        }
-                        await manager.broadcast(board_id, response)
+                    fields = {name: card_data[name] for name in crud.MOVE_FIELDS if name in card_data}
+                    await move_coalescer.submit(board_id, card_id, fields, user_info, exclude=connection)
 
             elif action == 'card.delete':
                 card_id = card_data.get('id')
                 if card_id:
-                    card = db.query(Card).filter(Card.id == card_id).first()
-                    if card:
-                        db.delete(card)
-                        db.commit()
-
+                    await move_coalescer.flush(card_id, board_id)
+                    deleted = await run_db(crud.delete_card, card_id, board_id)
+                    if deleted:
                         response = {
                             'type': 'card.deleted',
-                            'data': {'id': card_id, 'board_id': board_id},
+                            'data': deleted,
                             'user': user_info,
                         }
                         await manager.broadcast(board_id, response)
 
+            elif action == 'batch':
+                if not isinstance(card_data, list) or len(card_data) > WS_BATCH_MAX_OPERATIONS:
+                    _reject(connection, action, f'Expected a list of at most {WS_BATCH_MAX_OPERATIONS} operations')
+                    continue
+                if not all(isinstance(op, dict) and isinstance(op.get('data'), dict) for op in card_data):
+                    _reject(connection, action, 'Expected every operation to be an object with object data')
+                    continue
+                await move_coalescer.flush_board(board_id)
+                events = await run_db(crud.apply_batch, board_id, user_info['user_id'], card_data)
+                if events:
+                    response = {
+                        'type': 'batch',
+                        'data': events,
+                        'user': user_info,
+                    }
+                    await manager.broadcast(board_id, response)
+
     except WebSocketDisconnect:
-        manager.disconnect(websocket, board_id)
+        manager.disconnect(connection)
     except Exception as e:
-        manager.disconnect(websocket, board_id)
+        manager.disconnect(connection)
         await websocket.close(code=1011, reason=str(e))
-    finally:
-        db.close()
@@ -17,11 +17,16 @@ class CardBase(BaseModel):
     position: int = 0
 
 
-class CardCreate(CardBase):
+class CardPlacement(BaseModel):
+    after_id: int | None = None
+    before_id: int | None = None
+
+
+class CardCreate(CardBase, CardPlacement):
     pass
 
 
-class CardUpdate(BaseModel):
+class CardUpdate(CardPlacement):
     title: str | None = None
     description: str | None = None
     column: str | None = None
@@ -40,6 +45,7 @@ class CardAssignmentResponse(BaseModel):
 class CardResponse(CardBase):
     id: int
     board_id: int
+    rank: str
     created_by: int
     created_at: datetime
     updated_at: datetime
@@ -51,3 +57,56 @@ class CardResponse(CardBase):
 
 class AssignUserRequest(BaseModel):
     user_id: int
+
+
+class CardPatch(BaseModel):
+    id: int
+    title: str | None = None
+    description: str | None = None
+
+
+class CardMove(CardPlacement):
+    id: int
+    column: str | None = None
+    position: int | None = None
+
+
+class BulkCardCreate(BaseModel):
+    cards: list[CardBase]
+
+
+class BulkCardPatch(BaseModel):
+    cards: list[CardPatch]
+
+
+class BulkCardMove(BaseModel):
+    cards: list[CardMove]
+
+
+class BulkCardDelete(BaseModel):
+    ids: list[int]
+
+
+class BulkItemResult(BaseModel):
+    id: int | None = None
+    status: int
+    card: CardResponse | None = None
+    detail: str | None = None
+
+
+class BulkResponse(BaseModel):
+    results: list[BulkItemResult]
+
+
+class CardImportAssignment(BaseModel):
+    user_id: int
+    assigned_at: datetime | None = None
+
+
+class CardImport(CardBase):
+    """One NDJSON line of a card import; the lines of an export parse as these."""
+
+    rank: str | None = None
+    created_by: int | None = None
+    created_at: datetime | None = None
+    assigned_to: list[CardImportAssignment] = []
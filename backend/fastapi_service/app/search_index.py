@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import heapq
+import operator
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable
+
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'postgres')
+SEARCH_INDEX_MAX_BOARDS = int(os.getenv('SEARCH_INDEX_MAX_BOARDS', '200'))
+SEARCH_INDEX_TTL = float(os.getenv('SEARCH_INDEX_TTL', '300'))
+
+SEARCH_BACKENDS = ('postgres', 'memory')
+
+# Letters and digits, close to what Postgres' 'simple' configuration keeps.
+TOKEN_RE = re.compile(r'[^\W_]+')
+
+# ts_rank's default weights for the A (title) and B (description) labels.
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+# A term that only starts with the query token scores this share of an exact match.
+PREFIX_FACTOR = 0.5
+
+UPSERT_TYPES = ('card.created', 'card.updated', 'card.moved')
+DELETE_TYPES = ('card.deleted',)
+BATCH_TYPE = 'batch'
+
+# Resolves to the board's cards and any event messages the cards may predate.
+Loader = Callable[[], Awaitable[tuple[Iterable[dict[str, Any]], Iterable[dict[str, Any]]]]]
+
+if SEARCH_BACKEND not in SEARCH_BACKENDS:
+    raise ValueError(f'Unknown SEARCH_BACKEND: {SEARCH_BACKEND}')
+
+
+def tokenize(text: str | None) -> list[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class BoardIndex:
+    """Inverted index of one board's card titles and descriptions."""
+
+    __slots__ = ('loaded_at', 'cards', 'terms', 'postings', 'vocabulary')
+
+    def __init__(self, cards: Iterable[dict[str, Any]]):
+        self.loaded_at = time.monotonic()
+        self.cards: dict[int, dict[str, Any]] = {}
+        # Per card, each term and whether it came from the title.
+        self.terms: dict[int, dict[str, bool]] = {}
+        # Per term, the cards with it in their title and those with it only in the description.
+        self.postings: dict[str, tuple[set[int], set[int]]] = {}
+        for card in cards:
+            self._add(card)
+        # Sorted, so every term starting with a prefix sits in one contiguous run.
+        self.vocabulary = sorted(self.postings)
+
+    def _add(self, card: dict[str, Any]) -> list[str]:
+        card_id = card['id']
+        terms = dict.fromkeys(tokenize(card.get('description')), False)
+        terms.update(dict.fromkeys(tokenize(card.get('title')), True))
+        self.cards[card_id] = card
+        self.terms[card_id] = terms
+        new_terms = []
+        for term, in_title in terms.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = (set(), set())
+                new_terms.append(term)
+            posting[0 if in_title else 1].add(card_id)
+        return new_terms
+
+    def upsert(self, card: dict[str, Any]):
+        self.remove(card['id'])
+        for term in self._add(card):
+            bisect.insort(self.vocabulary, term)
+
+    def remove(self, card_id: int):
+        terms = self.terms.pop(card_id, None)
+        if terms is None:
+            return
+        del self.cards[card_id]
+        for term, in_title in terms.items():
+            posting = self.postings[term]
+            posting[0 if in_title else 1].discard(card_id)
+            if not posting[0] and not posting[1]:
+                del self.postings[term]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, term)]
+
+    def apply(self, message: dict[str, Any]):
+        events = message['data'] if message.get('type') == BATCH_TYPE else [message]
+        for event in events:
+            if event.get('type') in UPSERT_TYPES:
+                self.upsert(event['data'])
+            elif event.get('type') in DELETE_TYPES:
+                self.remove(event['data']['id'])
+
+    def _matches(self, token: str) -> dict[int, float]:
+        # Posting sets by score, lowest first, so better scores overwrite worse ones.
+        tiers: list[tuple[float, list[set[int]]]] = [
+            (DESCRIPTION_WEIGHT * PREFIX_FACTOR, []),
+            (DESCRIPTION_WEIGHT, []),
+            (TITLE_WEIGHT * PREFIX_FACTOR, []),
+            (TITLE_WEIGHT, []),
+        ]
+        vocabulary = self.vocabulary
+        index = bisect.bisect_left(vocabulary, token)
+        while index < len(vocabulary) and vocabulary[index].startswith(token):
+            term = vocabulary[index]
+            exact = term == token
+            titles, descriptions = self.postings[term]
+            tiers[3 if exact else 2][1].append(titles)
+            tiers[1 if exact else 0][1].append(descriptions)
+            index += 1
+
+        matches: dict[int, float] = {}
+        for score, postings in tiers:
+            for card_ids in postings:
+                matches.update(dict.fromkeys(card_ids, score))
+        return matches
+
+    def search(self, tokens: list[str], limit: int) -> list[dict[str, Any]]:
+        """Cards matching every token as a prefix, best first."""
+        scores: dict[int, float] | None = None
+        for token in set(tokens):
+            matches = self._matches(token)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {card_id: scores[card_id] + matches[card_id] for card_id in scores.keys() & matches.keys()}
+            if not scores:
+                return []
+        best = heapq.nlargest(limit, scores.items(), key=operator.itemgetter(1))
+        return [self.cards[card_id] for card_id, _ in best]
+
+
+class SearchIndex:
+    """Per-process inverted indexes of recently searched boards.
+
+    Built from the board snapshot on the first search and kept current from
+    the broadcast event stream, so every card mutation, on any replica,
+    reaches it. Least recently searched boards are dropped beyond
+    ``max_boards``; indexes are rebuilt after ``ttl`` seconds.
+    """
+
+    def __init__(self, max_boards: int = SEARCH_INDEX_MAX_BOARDS, ttl: float = SEARCH_INDEX_TTL):
+        self.max_boards = max_boards
+        self.ttl = ttl
+        self.searches = 0
+        self.builds = 0
+        self.evictions = 0
+        self._boards: OrderedDict[int, BoardIndex] = OrderedDict()
+        self._building: dict[int, asyncio.Future] = {}
+
+    async def _index(self, board_id: int, loader: Loader) -> BoardIndex:
+        index = self._boards.get(board_id)
+        if index is not None and time.monotonic() - index.loaded_at <= self.ttl:
+            self._boards.move_to_end(board_id)
+            return index
+
+        pending = self._building.get(board_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        self.builds += 1
+        future = asyncio.get_running_loop().create_future()
+        self._building[board_id] = future
+        try:
+            cards, missed = await loader()
+            index = BoardIndex(cards)
+            # Events that raced the snapshot; applying them again is harmless.
+            for message in missed:
+                index.apply(message)
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()
+            raise
+        else:
+            self._boards[board_id] = index
+            self._boards.move_to_end(board_id)
+            while len(self._boards) > self.max_boards:
+                self._boards.popitem(last=False)
+                self.evictions += 1
+            future.set_result(index)
+            return index
+        finally:
+            del self._building[board_id]
+
+    async def search(self, board_id: int, tokens: list[str], limit: int, loader: Loader) -> list[dict[str, Any]]:
+        self.searches += 1
+        index = await self._index(board_id, loader)
+        return index.search(tokens, limit)
+
+    async def on_event(self, board_id: int, envelope: dict[str, Any]):
+        index = self._boards.get(board_id)
+        if index is not None:
+            index.apply(envelope['message'])
+
+    def clear(self, *args: Any):
+        self._boards.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'backend': SEARCH_BACKEND,
+            'boards': len(self._boards),
+            'terms': sum(len(index.vocabulary) for index in self._boards.values()),
+            'searches': self.searches,
+            'builds': self.builds,
+            'evictions': self.evictions,
+        }
+
+
+search_index = SearchIndex()
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from app.encoding import Frame, encode
+
+SNAPSHOT_CACHE_MAX_BYTES = int(os.getenv('SNAPSHOT_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+SNAPSHOT_CACHE_TTL = float(os.getenv('SNAPSHOT_CACHE_TTL', '300'))
+
+UPSERT_TYPES = ('card.created', 'card.updated', 'card.moved')
+DELETE_TYPES = ('card.deleted',)
+BATCH_TYPE = 'batch'
+
+Loader = Callable[[], Awaitable[list[dict[str, Any]]]]
+
+
+def _card_order(card: dict[str, Any]) -> tuple[str, str, int]:
+    return card['column'], card['rank'], card['id']
+
+
+def _card_size(card: dict[str, Any]) -> int:
+    return len(encode(card))
+
+
+class BoardSnapshot:
+    __slots__ = ('board_id', 'seq', 'cards', 'sizes', 'size', 'loaded_at', 'frame')
+
+    def __init__(self, board_id: int, seq: int, cards: list[dict[str, Any]]):
+        self.board_id = board_id
+        # Every board event numbered at or below seq is reflected in cards.
+        self.seq = seq
+        self.cards: dict[int, dict[str, Any]] = {card['id']: card for card in cards}
+        self.sizes = {card_id: _card_size(card) for card_id, card in self.cards.items()}
+        self.size = sum(self.sizes.values())
+        self.loaded_at = time.monotonic()
+        # Encoded initial_state for this exact card set; dropped on any change.
+        self.frame: Frame | None = None
+
+    def card_list(self) -> list[dict[str, Any]]:
+        return sorted(self.cards.values(), key=_card_order)
+
+    def upsert(self, card: dict[str, Any]) -> int:
+        card_id = card['id']
+        size = _card_size(card)
+        delta = size - self.sizes.get(card_id, 0)
+        self.cards[card_id] = card
+        self.sizes[card_id] = size
+        self.size += delta
+        self.frame = None
+        return delta
+
+    def remove(self, card_id: int) -> int:
+        if card_id not in self.cards:
+            return 0
+        del self.cards[card_id]
+        delta = -self.sizes.pop(card_id)
+        self.size += delta
+        self.frame = None
+        return delta
+
+
+class BoardSnapshotCache:
+    """Per-process board snapshots kept current from the broadcast event stream.
+
+    Entries are evicted least-recently-used once the estimated encoded size
+    exceeds ``max_bytes``, and are reloaded after ``ttl`` seconds as a
+    backstop against missed events.
+    """
+
+    def __init__(self, max_bytes: int = SNAPSHOT_CACHE_MAX_BYTES, ttl: float = SNAPSHOT_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._boards: OrderedDict[int, BoardSnapshot] = OrderedDict()
+        self._loading: dict[int, asyncio.Future] = {}
+        self._dirty: set[int] = set()
+
+    async def get(self, board_id: int, seq: int, loader: Loader) -> BoardSnapshot:
+        """Return the board's snapshot, loading it if needed.
+
+        ``seq`` is the board's event position before the load starts; events
+        after it may or may not be included in a freshly loaded snapshot.
+        """
+        snapshot = self._boards.get(board_id)
+        if snapshot is not None:
+            if time.monotonic() - snapshot.loaded_at <= self.ttl:
+                self._boards.move_to_end(board_id)
+                self.hits += 1
+                return snapshot
+            self._discard(board_id)
+            self.expirations += 1
+
+        self.misses += 1
+        pending = self._loading.get(board_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        self.loads += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[board_id] = future
+        self._dirty.discard(board_id)
+        try:
+            snapshot = BoardSnapshot(board_id, seq, await loader())
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved so a load with no waiters does not log a warning.
+            future.exception()
+            raise
+        else:
+            if board_id not in self._dirty:
+                self._store(snapshot)
+            future.set_result(snapshot)
+            return snapshot
+        finally:
+            del self._loading[board_id]
+            self._dirty.discard(board_id)
+
+    def _store(self, snapshot: BoardSnapshot):
+        if snapshot.size > self.max_bytes:
+            return
+        self._boards[snapshot.board_id] = snapshot
+        self.size += snapshot.size
+        self._evict()
+
+    def _discard(self, board_id: int):
+        snapshot = self._boards.pop(board_id, None)
+        if snapshot is not None:
+            self.size -= snapshot.size
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._boards:
+            _, snapshot = self._boards.popitem(last=False)
+            self.size -= snapshot.size
+            self.evictions += 1
+
+    def apply(self, board_id: int, message: dict[str, Any]):
+        message_type = message.get('type')
+        if message_type == BATCH_TYPE:
+            events = message['data']
+        elif message_type in UPSERT_TYPES or message_type in DELETE_TYPES:
+            events = [message]
+        else:
+            return
+
+        if board_id in self._loading:
+            # The in-flight load may predate this change; do not cache its result.
+            self._dirty.add(board_id)
+
+        snapshot = self._boards.get(board_id)
+        if snapshot is None:
+            return
+        snapshot.seq = max(snapshot.seq, message['seq'])
+        for event in events:
+            if event['type'] in UPSERT_TYPES:
+                self.size += snapshot.upsert(event['data'])
+            elif event['type'] in DELETE_TYPES:
+                self.size += snapshot.remove(event['data']['id'])
+        self._evict()
+
+    async def on_event(self, board_id: int, envelope: dict[str, Any]):
+        self.apply(board_id, envelope['message'])
+
+    def clear(self, *args: Any):
+        self._boards.clear()
+        self.size = 0
+        self._dirty.update(self._loading)
+
+    def invalidate(self, board_id: int):
+        self._discard(board_id)
+        if board_id in self._loading:
+            self._dirty.add(board_id)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'boards': len(self._boards),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'loads': self.loads,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+snapshot_cache = BoardSnapshotCache()
@@ -0,0 +1,99 @@
+"""Bulk card endpoints versus the per-card loop.
+
+Creates, patches, moves and deletes ``--cards`` cards on a scratch board,
+once through the single-card crud functions (one transaction per card, as
+the per-card REST endpoints do) and once through the set-based bulk
+functions. Needs the Postgres database configured for the service. Run
+from backend/fastapi_service:
+
+    python -m benchmarks.bulk_cards
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable
+
+from app import crud
+from app.database import SessionLocal
+from app.models import Card, CardAssignment
+
+
+def _run(fn: Callable[..., Any], *args: Any) -> Any:
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+def _clear(board_id: int):
+    db = SessionLocal()
+    try:
+        ids = db.query(Card.id).filter(Card.board_id == board_id)
+        db.query(CardAssignment).filter(CardAssignment.card_id.in_(ids)).delete(synchronize_session=False)
+        db.query(Card).filter(Card.board_id == board_id).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _timed(fn: Callable[[], Any]) -> tuple[float, Any]:
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def _loop(board_id: int, count: int) -> dict[str, float]:
+    timings = {}
+    timings['create'], cards = _timed(lambda: [
+        _run(crud.create_card, board_id, 1, {'title': f'Card {index}', 'column': 'todo'}) for index in range(count)
+    ])
+    ids = [card['id'] for card in cards]
+    timings['patch'], _ = _timed(lambda: [
+        _run(crud.update_card, card_id, {'title': f'Renamed {card_id}'}, board_id) for card_id in ids
+    ])
+    timings['move'], _ = _timed(lambda: [
+        _run(crud.update_card, card_id, {'column': 'done'}, board_id) for card_id in ids
+    ])
+    timings['delete'], _ = _timed(lambda: [_run(crud.delete_card, card_id, board_id) for card_id in ids])
+    return timings
+
+
+def _bulk(board_id: int, count: int) -> dict[str, float]:
+    timings = {}
+    timings['create'], cards = _timed(lambda: _run(
+        crud.bulk_create_cards, board_id, 1, [{'title': f'Card {index}', 'column': 'todo'} for index in range(count)]
+    ))
+    ids = [card['id'] for card in cards]
+    timings['patch'], _ = _timed(lambda: _run(
+        crud.bulk_update_cards, board_id, [{'id': card_id, 'title': f'Renamed {card_id}'} for card_id in ids]
+    ))
+    timings['move'], _ = _timed(lambda: _run(
+        crud.bulk_move_cards, board_id, [{'id': card_id, 'column': 'done'} for card_id in ids]
+    ))
+    timings['delete'], _ = _timed(lambda: _run(crud.bulk_delete_cards, board_id, ids))
+    return timings
+
+
+def main(board_id: int, counts: list[int]):
+    print(f'{"cards":>6}  {"operation":>9}  {"loop ms":>9}  {"bulk ms":>9}  {"speedup":>7}')
+    for count in counts:
+        _clear(board_id)
+        loop = _loop(board_id, count)
+        _clear(board_id)
+        bulk = _bulk(board_id, count)
+        for operation in loop:
+            print(
+                f'{count:>6}  {operation:>9}  {loop[operation] * 1e3:>9.1f}  {bulk[operation] * 1e3:>9.1f}  '
+                f'{loop[operation] / bulk[operation]:>6.1f}x'
+            )
+    _clear(board_id)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--board', type=int, default=2_000_000_000, help='scratch board id; its cards are deleted')
+    parser.add_argument('--cards', type=int, nargs='+', default=[100, 1000])
+    args = parser.parse_args()
+    main(args.board, args.cards)
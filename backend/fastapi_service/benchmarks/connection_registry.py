@@ -0,0 +1,132 @@
+"""Memory per connection and disconnect cost of the WebSocket connection registry.
+
+Registers ``--sockets`` simulated connections spread over ``--boards``
+boards and reports the bytes each one costs, traced with tracemalloc:
+the ``__slots__`` record with its registry index entries, the writer task
+every live connection runs, and for comparison the same record with a
+per-instance ``__dict__`` and the original ``(websocket, user_info)``
+tuples in per-board lists. It then times ``--churn`` disconnects from one
+board against the original list rebuild. Needs no database. Run from
+backend/fastapi_service:
+
+    python -m benchmarks.connection_registry
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from app.connections import Connection, ConnectionRegistry
+
+
+class NullWebSocket:
+    async def send_text(self, data: str):
+        pass
+
+    async def send_bytes(self, data: bytes):
+        pass
+
+    async def close(self, code: int = 1000, reason: str | None = None):
+        pass
+
+
+class DictConnection:
+    """The same fields as Connection, kept in a per-instance __dict__."""
+
+    def __init__(self, websocket: Any, board_id: int, user_info: dict[str, Any]):
+        connection = Connection(websocket, board_id, user_info, lambda _: None)
+        for name in Connection.__slots__:
+            setattr(self, name, getattr(connection, name))
+
+
+def _user(index: int) -> dict[str, Any]:
+    return {'user_id': index % 5000, 'username': f'user{index % 5000}'}
+
+
+def _traced(build: Callable[[], Any]) -> tuple[int, Any]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, kept
+
+
+async def _memory(sockets: int, boards: int) -> dict[str, float]:
+    websocket = NullWebSocket()
+
+    def slotted() -> ConnectionRegistry:
+        registry = ConnectionRegistry()
+        for index in range(sockets):
+            registry.add(Connection(websocket, index % boards, _user(index), registry.remove))
+        return registry
+
+    def with_dict() -> dict[int, list[DictConnection]]:
+        by_board: dict[int, list[DictConnection]] = {}
+        for index in range(sockets):
+            by_board.setdefault(index % boards, []).append(DictConnection(websocket, index % boards, _user(index)))
+        return by_board
+
+    def original() -> dict[int, list[tuple[Any, dict[str, Any]]]]:
+        by_board: dict[int, list[tuple[Any, dict[str, Any]]]] = {}
+        for index in range(sockets):
+            by_board.setdefault(index % boards, []).append((websocket, _user(index)))
+        return by_board
+
+    sizes = {}
+    sizes['slots + indexes'], registry = _traced(slotted)
+    sizes['writer tasks'], _ = _traced(lambda: [connection.start() for connection in registry])
+    sizes['__dict__ records'], _ = _traced(with_dict)
+    sizes['original tuples'], _ = _traced(original)
+    for connection in list(registry):
+        connection.close()
+    await asyncio.sleep(0)
+    return {name: size / sockets for name, size in sizes.items()}
+
+
+def _churn(sockets: int, churn: int) -> tuple[float, float]:
+    websocket = NullWebSocket()
+    registry = ConnectionRegistry()
+    connections = [Connection(websocket, 1, _user(index), registry.remove) for index in range(sockets)]
+    for connection in connections:
+        registry.add(connection)
+    started = time.perf_counter()
+    for connection in connections[:churn]:
+        registry.remove(connection)
+    indexed = time.perf_counter() - started
+
+    board = [(websocket, _user(index)) for index in range(sockets)]
+    doomed = board[:churn]
+    started = time.perf_counter()
+    for entry in doomed:
+        # The original disconnect: rebuild the board's list without the socket.
+        board = [other for other in board if other is not entry]
+    rebuilt = time.perf_counter() - started
+    return indexed, rebuilt
+
+
+async def main(counts: list[int], boards: int, churn: int):
+    print(f'{"sockets":>8}  {"layout":>17}  {"bytes/socket":>12}')
+    for count in counts:
+        for name, per_socket in (await _memory(count, boards)).items():
+            print(f'{count:>8}  {name:>17}  {per_socket:>12.0f}')
+    print()
+    print(f'{"sockets":>8}  {"disconnects":>11}  {"indexed ms":>10}  {"list rebuild ms":>15}')
+    for count in counts:
+        indexed, rebuilt = _churn(count, min(churn, count))
+        print(f'{count:>8}  {min(churn, count):>11}  {indexed * 1e3:>10.2f}  {rebuilt * 1e3:>15.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sockets', type=int, nargs='+', default=[10_000, 50_000])
+    parser.add_argument('--boards', type=int, default=100)
+    parser.add_argument('--churn', type=int, default=1000, help='disconnects timed from one board')
+    args = parser.parse_args()
+    asyncio.run(main(args.sockets, args.boards, args.churn))
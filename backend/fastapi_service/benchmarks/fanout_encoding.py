@@ -0,0 +1,83 @@
+"""Fan-out encoding microbenchmark.
+
+Compares the old per-socket ``send_json`` path (one ``json.dumps`` per
+subscriber) with the serialize-once ``Frame`` path used by the
+ConnectionManager. Run from backend/fastapi_service:
+
+    python -m benchmarks.fanout_encoding
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any
+
+from app.encoding import Frame
+
+
+class NullWebSocket:
+    async def send_text(self, data: str):
+        pass
+
+
+def _card_moved() -> dict[str, Any]:
+    now = datetime.utcnow().isoformat()
+    return {
+        'type': 'card.moved',
+        'data': {
+            'id': 4821,
+            'board_id': 17,
+            'title': 'Migrate billing webhooks to the new queue',
+            'description': 'Retry policy, dead letter handling and alerting. ' * 4,
+            'column': 'in_progress',
+            'position': 12,
+            'created_by': 3,
+            'created_at': now,
+            'updated_at': now,
+            'assigned_to': [{'id': 91, 'user_id': 3}, {'id': 92, 'user_id': 8}],
+        },
+        'user': {'user_id': 3, 'username': 'dana'},
+    }
+
+
+async def _per_socket(sockets: list[NullWebSocket], message: dict[str, Any]):
+    for websocket in sockets:
+        # Mirrors starlette's WebSocket.send_json.
+        await websocket.send_text(json.dumps(message, separators=(',', ':'), ensure_ascii=False))
+
+
+async def _serialize_once(sockets: list[NullWebSocket], message: dict[str, Any]):
+    frame = Frame(message)
+    for websocket in sockets:
+        await websocket.send_text(frame.text)
+
+
+async def _measure(fanout, subscribers: int, rounds: int) -> float:
+    sockets = [NullWebSocket() for _ in range(subscribers)]
+    message = _card_moved()
+    started = time.process_time()
+    for _ in range(rounds):
+        await fanout(sockets, message)
+    return (time.process_time() - started) / rounds
+
+
+async def main(subscriber_counts: list[int], rounds: int):
+    print(f'{"subscribers":>11}  {"per-socket us":>13}  {"once us":>9}  {"speedup":>7}')
+    for subscribers in subscriber_counts:
+        per_socket = await _measure(_per_socket, subscribers, rounds)
+        once = await _measure(_serialize_once, subscribers, rounds)
+        print(
+            f'{subscribers:>11}  {per_socket * 1e6:>13.1f}  {once * 1e6:>9.1f}  '
+            f'{per_socket / once:>6.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.subscribers, args.rounds))
@@ -0,0 +1,79 @@
+"""JSON versus MessagePack WebSocket frames.
+
+Encodes an ``initial_state`` frame for boards of ``--cards`` synthetic cards,
+and a single ``card.moved`` frame, with both encodings. Reports frame size
+and the CPU time to encode (once per frame on the server) and to decode
+(once per frame on every client). Needs no database. Run from
+backend/fastapi_service:
+
+    python -m benchmarks.ws_codec
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+import msgpack
+
+from app.encoding import COLUMNS, decode, encode, pack
+
+
+def _card(index: int, now: datetime) -> dict[str, Any]:
+    created = now - timedelta(minutes=index)
+    return {
+        'id': index + 1,
+        'board_id': 1,
+        'title': f'Card {index} needs review',
+        'description': 'Follow up with the team about the rollout plan' if index % 2 else None,
+        'column': COLUMNS[index % len(COLUMNS)],
+        'position': 0,
+        'rank': f'i{index:05d}',
+        'created_by': 1 + index % 7,
+        'created_at': created.isoformat(),
+        'updated_at': (created + timedelta(seconds=30)).isoformat(),
+        'assigned_to': [
+            {'id': index + 1, 'user_id': 1 + index % 5, 'assigned_at': created.isoformat()}
+        ] if index % 3 == 0 else [],
+    }
+
+
+def _per_call(fn: Callable[[], Any], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _compare(label: str, message: dict[str, Any], repeat: int):
+    text = encode(message).encode()
+    packed = pack(message)
+    rows = [
+        ('json', len(text), _per_call(lambda: encode(message), repeat), _per_call(lambda: decode(text), repeat)),
+        ('msgpack', len(packed), _per_call(lambda: pack(message), repeat),
+         _per_call(lambda: msgpack.unpackb(packed), repeat)),
+    ]
+    for codec, size, encode_s, decode_s in rows:
+        print(f'{label:>14}  {codec:>8}  {size:>11,}  {size / rows[0][1]:>5.0%}  '
+              f'{encode_s * 1e3:>10.3f}  {decode_s * 1e3:>10.3f}')
+
+
+def main(counts: list[int], repeat: int):
+    now = datetime.utcnow()
+    print(f'{"frame":>14}  {"codec":>8}  {"bytes":>11}  {"size":>5}  {"encode ms":>10}  {"decode ms":>10}')
+    for count in counts:
+        cards = [_card(index, now) for index in range(count)]
+        _compare(f'initial {count}', {'type': 'initial_state', 'data': cards, 'seq': 1_700_000_000_000_000}, repeat)
+    moved = {'type': 'card.moved', 'data': _card(1, now), 'user': {'user_id': 1, 'username': 'alice'}, 'seq': 1}
+    _compare('card.moved', moved, repeat * 100)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cards', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5, help='best of this many runs')
+    args = parser.parse_args()
+    main(args.cards, args.repeat)
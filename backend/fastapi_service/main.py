@@ -1,12 +1,24 @@
 from __future__ import annotations
 
 import os
+from typing import Any
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.board_access import board_access
+from app.compression import CompressionMiddleware, compression_stats
+from app.connections import manager
+from app.database import pool_stats
+from app.event_log import event_log
+from app.heartbeat import heartbeat
+from app.move_coalescer import move_coalescer
+from app.rank_rebalancer import rank_rebalancer
+from app.rate_limit import rate_limiter
 from app.routers import cards, websocket
+from app.search_index import search_index
+from app.snapshot_cache import snapshot_cache
 
 load_dotenv()
 
@@ -20,11 +32,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=['*'],
     allow_headers=['*'],
+    expose_headers=[cards.NEXT_CURSOR_HEADER, 'ETag'],
 )
 
+app.add_middleware(CompressionMiddleware, paths=('/api/',))
+
 app.include_router(cards.router, prefix='/api', tags=['cards'])
 app.include_router(websocket.router, prefix='/ws', tags=['websocket'])
 
+manager.backend.subscribe(event_log.on_event)
+manager.backend.subscribe(snapshot_cache.on_event)
+manager.backend.subscribe(rank_rebalancer.on_event)
+manager.backend.subscribe(search_index.on_event)
+manager.backend.subscribe_control(board_access.on_control)
+manager.backend.on_reset(event_log.reset)
+manager.backend.on_reset(snapshot_cache.clear)
+manager.backend.on_reset(search_index.clear)
+
+
+@app.on_event('startup')
+async def start_broadcast() -> None:
+    await manager.backend.start()
+    event_log.reset(manager.backend.floor_seq)
+    rank_rebalancer.start()
+    heartbeat.start()
+
+
+@app.on_event('shutdown')
+async def stop_broadcast() -> None:
+    await heartbeat.stop()
+    await rank_rebalancer.stop()
+    await move_coalescer.flush_all()
+    await manager.backend.stop()
+
 
 @app.get('/')
 def root() -> dict[str, str]:
@@ -34,3 +74,20 @@ def root() -> dict[str, str]:
 @app.get('/health')
 def health_check() -> dict[str, str]:
     return {'status': 'healthy'}
+
+
+@app.get('/metrics')
+def metrics() -> dict[str, Any]:
+    return {
+        'websocket': manager.stats(),
+        'snapshot_cache': snapshot_cache.stats(),
+        'event_log': event_log.stats(),
+        'move_coalescer': move_coalescer.stats(),
+        'rank_rebalancer': rank_rebalancer.stats(),
+        'db_pool': pool_stats(),
+        'board_access': board_access.stats(),
+        'search_index': search_index.stats(),
+        'compression': compression_stats(),
+        'heartbeat': heartbeat.stats(),
+        'rate_limit': rate_limiter.stats(),
+    }
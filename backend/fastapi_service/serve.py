@@ -0,0 +1,23 @@
+"""Runs the service under uvicorn with the WebSocket protocol from app.compression.
+
+uvicorn's command line cannot select a custom protocol class, and its own
+permessage-deflate has no settings or size threshold. Run from
+backend/fastapi_service:
+
+    python serve.py --host 0.0.0.0 --port 8001 [--reload]
+"""
+from __future__ import annotations
+
+import argparse
+
+import uvicorn
+
+from app.compression import CompressingWebSocketProtocol
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--reload', action='store_true')
+    args = parser.parse_args()
+    uvicorn.run('main:app', host=args.host, port=args.port, reload=args.reload, ws=CompressingWebSocketProtocol)
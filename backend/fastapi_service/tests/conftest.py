@@ -0,0 +1,96 @@
+"""Points the service at a scratch database before any app module is imported.
+
+Tests run against a temporary SQLite file by default. Set TEST_DATABASE_URL
+to a throwaway Postgres database to also run the Postgres-only tests; its
+card tables are created if missing and emptied after every test.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+from typing import Any, Callable
+
+import pytest
+
+_scratch = tempfile.TemporaryDirectory(prefix='fastapi_tests_')
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL') or f'sqlite:///{_scratch.name}/test.db'
+os.environ['DATABASE_URL'] = TEST_DATABASE_URL
+os.environ['JWT_SECRET_KEY'] = 'test-secret'
+os.environ['BROADCAST_BACKEND'] = 'memory'
+os.environ['SEARCH_BACKEND'] = 'memory'
+
+from jose import jwt  # noqa: E402
+from sqlalchemy.dialects.postgresql import TSVECTOR  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.schema import CreateColumn  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Card, CardAssignment  # noqa: E402
+
+
+def pytest_configure(config: pytest.Config):
+    config.addinivalue_line('markers', 'postgres: needs TEST_DATABASE_URL pointing at Postgres')
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]):
+    if engine.dialect.name == 'postgresql':
+        return
+    skip = pytest.mark.skip(reason='needs TEST_DATABASE_URL pointing at Postgres')
+    for item in items:
+        if 'postgres' in item.keywords:
+            item.add_marker(skip)
+
+
+@compiles(CreateColumn, 'sqlite')
+def _sqlite_column(element: CreateColumn, compiler: Any, **kw: Any) -> str:
+    # SQLite has no tsvector; search runs on the memory backend, so the generated column becomes plain text.
+    column = element.element
+    if isinstance(column.type, TSVECTOR):
+        return f'{column.name} TEXT'
+    return compiler.visit_create_column(element, **kw)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def schema():
+    Base.metadata.create_all(engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def clean_tables():
+    yield
+    with engine.begin() as connection:
+        connection.execute(CardAssignment.__table__.delete())
+        connection.execute(Card.__table__.delete())
+
+
+@pytest.fixture
+def db() -> Session:
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_token() -> Callable[..., str]:
+    def make(user_id: int = 1, username: str = 'tester') -> str:
+        return jwt.encode({'user_id': user_id, 'username': username}, os.environ['JWT_SECRET_KEY'], algorithm='HS256')
+
+    return make
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+
+    import main
+    from app.snapshot_cache import snapshot_cache
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+    # Cards are deleted between tests without broadcasting, so cached snapshots would be stale.
+    snapshot_cache.clear()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+
+import psycopg2
+import pytest
+
+from app import broadcast
+from app.broadcast import PostgresBroadcast, _libpq_dsn
+from app.database import DATABASE_URL
+
+
+def test_libpq_dsn_drops_the_driver_suffix():
+    assert _libpq_dsn('postgresql+psycopg2://user:p%40ss@db:5433/board') == 'postgresql://user:p%40ss@db:5433/board'
+
+
+@pytest.mark.postgres
+def test_publish_survives_publish_connection_failures(monkeypatch):
+    monkeypatch.setattr(broadcast, 'BROADCAST_RECONNECT_DELAY', 0.05)
+    backend = PostgresBroadcast(
+        _libpq_dsn(DATABASE_URL), 'test_events', 'test_event_seq', 'test_event_payload', 'test_control'
+    )
+    connect, notify = backend._connect, backend._notify
+
+    def unreachable():
+        raise psycopg2.OperationalError('could not connect')
+
+    async def run():
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def handler(board_id, envelope):
+            events.put_nowait(envelope['message']['n'])
+
+        backend.subscribe(handler)
+        await backend.start()
+        try:
+            # A failed send retries on a new connection and closes the old one instead of leaking it.
+            failed = backend._publish_conn
+
+            def notify_until_closed(tail: str):
+                if not failed.closed:
+                    raise psycopg2.OperationalError('server closed the connection unexpectedly')
+                notify(tail)
+
+            monkeypatch.setattr(backend, '_notify', notify_until_closed)
+            await backend.publish(1, {'message': {'n': 1}})
+            assert failed.closed
+            assert await asyncio.wait_for(events.get(), timeout=5) == 1
+
+            # When the retry fails too, the event is dropped rather than raised to the caller.
+            monkeypatch.setattr(backend, '_notify', lambda tail: unreachable())
+            monkeypatch.setattr(backend, '_connect', unreachable)
+            await backend.publish(1, {'message': {'n': 2}})
+            assert backend._publish_conn is None
+            await backend.publish(1, {'message': {'n': 3}})
+
+            # The publisher reconnects in the background.
+            monkeypatch.setattr(backend, '_notify', notify)
+            monkeypatch.setattr(backend, '_connect', connect)
+            await asyncio.wait_for(backend._republish, timeout=5)
+            await backend.publish(1, {'message': {'n': 4}})
+            assert await asyncio.wait_for(events.get(), timeout=5) == 4
+        finally:
+            await backend.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import pytest
+
+from app import crud
+
+
+@pytest.fixture
+def headers(make_token) -> dict[str, str]:
+    return {'Authorization': f'Bearer {make_token()}'}
+
+
+@pytest.mark.postgres
+def test_bulk_update_reports_cards_not_on_board(client, db, headers):
+    first, second = (crud.create_card(db, 1, 1, {'title': title})['id'] for title in ('first', 'second'))
+    elsewhere = crud.create_card(db, 2, 1, {'title': 'elsewhere'})['id']
+
+    response = client.patch('/api/boards/1/cards/bulk', headers=headers, json={'cards': [
+        {'id': first, 'title': 'renamed'},
+        {'id': elsewhere, 'title': 'stolen'},
+        {'id': 999999, 'title': 'missing'},
+        {'id': second, 'description': 'described'},
+        {'id': first, 'description': 'later edit'},
+    ]})
+
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert [(result['id'], result['status']) for result in results] == [
+        (first, 200), (elsewhere, 404), (999999, 404), (second, 200), (first, 200),
+    ]
+    assert results[0]['card']['title'] == 'renamed'
+    assert results[0]['card']['description'] == 'later edit'
+    assert results[3]['card']['description'] == 'described'
+    assert 'card' not in results[1] and results[1]['detail'] == 'Card not found'
+    db.expire_all()
+    assert crud.get_card(db, elsewhere, 2)['title'] == 'elsewhere'
+
+
+def test_bulk_delete_reports_cards_not_on_board(client, db, headers):
+    kept, deleted = (crud.create_card(db, 1, 1, {'title': title})['id'] for title in ('kept', 'deleted'))
+    crud.assign_user(db, deleted, 2)
+    elsewhere = crud.create_card(db, 2, 1, {'title': 'elsewhere'})['id']
+
+    response = client.post('/api/boards/1/cards/bulk/delete', headers=headers, json={
+        'ids': [deleted, elsewhere, 999999],
+    })
+
+    assert response.status_code == 200
+    assert [(result['id'], result['status']) for result in response.json()['results']] == [
+        (deleted, 204), (elsewhere, 404), (999999, 404),
+    ]
+    db.expire_all()
+    assert [card['id'] for card in crud.list_cards(db, 1)] == [kept]
+    assert crud.get_card(db, elsewhere, 2) is not None
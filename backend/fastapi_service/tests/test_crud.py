@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator
+
+import pytest
+from sqlalchemy import event
+
+from app import crud
+from app.database import engine
+from app.models import Card, CardAssignment
+
+
+@contextmanager
+def count_queries() -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def _seed(db, board_id: int, count: int, assignees: int = 2) -> list[int]:
+    cards = [Card(board_id=board_id, title=f'Card {index}', created_by=1, rank=f'{index:04d}') for index in range(count)]
+    for card in cards:
+        card.assignments = [CardAssignment(user_id=user_id) for user_id in range(1, assignees + 1)]
+    db.add_all(cards)
+    db.commit()
+    return [card.id for card in cards]
+
+
+def _list_queries(db, board_id: int) -> int:
+    db.expire_all()
+    with count_queries() as statements:
+        cards = crud.list_cards(db, board_id)
+    assert all(len(card['assigned_to']) == 2 for card in cards)
+    return len(statements)
+
+
+def test_list_cards_query_count_does_not_grow_with_cards(db):
+    _seed(db, 1, 3)
+    _seed(db, 2, 40)
+
+    small = _list_queries(db, 1)
+    large = _list_queries(db, 2)
+
+    assert small == large == 2
+
+
+def test_get_card_query_count_does_not_grow_with_assignments(db):
+    few = _seed(db, 1, 1, assignees=1)[0]
+    many = _seed(db, 1, 1, assignees=25)[0]
+
+    counts = []
+    for card_id, assignees in ((few, 1), (many, 25)):
+        db.expire_all()
+        with count_queries() as statements:
+            card = crud.get_card(db, card_id, 1)
+        assert len(card['assigned_to']) == assignees
+        counts.append(len(statements))
+
+    assert counts == [2, 2]
+
+
+def _column_order(db, board_id: int, column: str) -> list[int]:
+    db.expire_all()
+    return [card['id'] for card in crud.list_cards(db, board_id) if card['column'] == column]
+
+
+@pytest.mark.postgres
+@pytest.mark.parametrize('placement, expected', [
+    ({'position': 0}, [4, 0, 1, 2, 3]),
+    ({'before_id': 1}, [0, 4, 1, 2, 3]),
+    ({'after_id': 1}, [0, 1, 4, 2, 3]),
+])
+def test_bulk_move_without_column_places_within_source_column(db, placement, expected):
+    ids = [crud.create_card(db, 1, 1, {'title': f'Card {index}'})['id'] for index in range(5)]
+    anchors = {name: ids[value] for name, value in placement.items() if name != 'position'}
+
+    moved = crud.bulk_move_cards(db, 1, [{'id': ids[4], **placement, **anchors}])
+
+    assert moved[ids[4]]['column'] == 'todo'
+    assert _column_order(db, 1, 'todo') == [ids[index] for index in expected]
+
+
+@pytest.mark.postgres
+def test_bulk_move_without_column_appends_after_source_column(db):
+    ids = [crud.create_card(db, 1, 1, {'title': f'Card {index}'})['id'] for index in range(3)]
+
+    crud.bulk_move_cards(db, 1, [{'id': ids[0]}])
+
+    assert _column_order(db, 1, 'todo') == [ids[1], ids[2], ids[0]]
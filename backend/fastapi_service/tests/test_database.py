@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import asyncio
+
+from app import database
+from app.database import stream_db
+
+
+def _numbers(db, count: int):
+    return iter(range(count))
+
+
+def test_streams_beyond_the_limit_wait_for_a_slot(monkeypatch):
+    monkeypatch.setattr(database, 'stream_slots', asyncio.Semaphore(1))
+
+    async def run():
+        first = stream_db(_numbers, 3)
+        assert await first.__anext__() == 0
+
+        second_stream = stream_db(_numbers, 3)
+        second = asyncio.create_task(second_stream.__anext__())
+        await asyncio.sleep(0.05)
+        # The second stream has not opened a session while the first holds the only slot.
+        assert not second.done()
+
+        await first.aclose()
+        assert await asyncio.wait_for(second, timeout=5) == 0
+        await second_stream.aclose()
+
+    asyncio.run(run())
+
+
+def test_pool_overflow_is_not_negative_below_pool_size(db):
+    db.connection()
+
+    stats = database.pool_stats()
+
+    assert stats['checked_out'] == 1
+    assert stats['overflow'] == 0
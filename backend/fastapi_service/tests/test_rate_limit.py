@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from app.rate_limit import RateLimiter
+
+
+def _connection() -> SimpleNamespace:
+    frames = []
+    return SimpleNamespace(id=1, user_id=1, board_id=1, frames=frames, enqueue=frames.append)
+
+
+def _limiter(rate: float, burst: float, max_delay: float = 0.0) -> RateLimiter:
+    return RateLimiter({'connection': (rate, burst), 'user': (0, 0), 'board': (0, 0)}, max_delay=max_delay)
+
+
+def test_batch_is_charged_per_operation():
+    limiter, connection = _limiter(1, 10), _connection()
+
+    async def run() -> list[bool]:
+        return [await limiter.admit(connection, 'batch', 6), await limiter.admit(connection, 'batch', 6)]
+
+    assert asyncio.run(run()) == [True, False]
+    assert connection.frames[-1].message['data']['cost'] == 6
+
+
+def test_batch_larger_than_burst_is_rejected_without_waiting():
+    limiter, connection = _limiter(1000, 10, max_delay=5), _connection()
+
+    assert asyncio.run(limiter.admit(connection, 'batch', 11)) is False
+    assert connection.frames[-1].message['data']['retry_after'] is None
+    assert limiter.stats()['deferred'] == 0
+
+
+def test_deferred_counts_only_admitted_actions():
+    limiter = RateLimiter({'connection': (0, 0), 'user': (10, 1), 'board': (0, 0)}, max_delay=0.15)
+    connections = [SimpleNamespace(id=index, user_id=1, board_id=1, enqueue=lambda frame: None) for index in range(3)]
+
+    async def run() -> list[bool]:
+        assert await limiter.admit(connections[0], 'card.update')
+        # Both wait for the user's next token; the first to wake takes it and the other runs out of time.
+        return list(await asyncio.gather(*(limiter.admit(connection, 'card.update') for connection in connections[1:])))
+
+    assert sorted(asyncio.run(run())) == [False, True]
+    stats = limiter.stats()
+    assert stats['deferred'] == 1
+    assert stats['rejected'] == {'user': 1}
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import threading
+
+from app import crud
+
+
+def test_slow_query_does_not_block_other_connections(client, make_token, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    create_card = crud.create_card
+
+    def stalled_create_card(db, board_id, created_by, data):
+        if data.get('title') == 'slow':
+            started.set()
+            # Released by the test; the timeout only keeps a regression from hanging the run.
+            release.wait(timeout=10)
+        return create_card(db, board_id, created_by, data)
+
+    monkeypatch.setattr(crud, 'create_card', stalled_create_card)
+
+    with client.websocket_connect(f'/ws/boards/1?token={make_token(1)}') as slow, \
+            client.websocket_connect(f'/ws/boards/1?token={make_token(2)}') as other:
+        assert slow.receive_json()['type'] == 'initial_state'
+        assert other.receive_json()['type'] == 'initial_state'
+
+        slow.send_json({'action': 'card.create', 'data': {'title': 'slow'}})
+        assert started.wait(timeout=5)
+
+        other.send_json({'action': 'card.create', 'data': {'title': 'fast'}})
+        message = other.receive_json()
+        assert message['type'] == 'card.created'
+        assert message['data']['title'] == 'fast'
+        assert not release.is_set()
+
+        release.set()
+        titles = {slow.receive_json()['data']['title'], slow.receive_json()['data']['title']}
+        assert titles == {'slow', 'fast'}
+        assert other.receive_json()['data']['title'] == 'slow'
+
+
+def test_malformed_operation_data_is_rejected_without_closing(client, make_token):
+    with client.websocket_connect(f'/ws/boards/1?token={make_token()}') as websocket:
+        assert websocket.receive_json()['type'] == 'initial_state'
+
+        websocket.send_json({'action': 'batch', 'data': [
+            {'action': 'card.create', 'data': {'title': 'kept out'}},
+            {'action': 'card.update', 'data': 'not an object'},
+        ]})
+        error = websocket.receive_json()
+        assert error['type'] == 'error'
+        assert error['data']['action'] == 'batch'
+
+        websocket.send_json({'action': 'card.update', 'data': 'not an object'})
+        error = websocket.receive_json()
+        assert error['type'] == 'error'
+        assert error['data']['action'] == 'card.update'
+
+        # The socket is still open and nothing from the rejected batch was applied.
+        websocket.send_json({'action': 'card.create', 'data': {'title': 'after'}})
+        message = websocket.receive_json()
+        assert message['type'] == 'card.created'
+        assert message['data']['title'] == 'after'
+    assert [card['title'] for card in client.get(
+        '/api/boards/1/cards', headers={'Authorization': f'Bearer {make_token()}'}
+    ).json()] == ['after']
+
+
+def test_move_from_another_board_does_not_redirect_pending_move(client, make_token):
+    with client.websocket_connect(f'/ws/boards/1?token={make_token(1)}') as owner, \
+            client.websocket_connect(f'/ws/boards/2?token={make_token(2)}') as stranger:
+        assert owner.receive_json()['type'] == 'initial_state'
+        assert stranger.receive_json()['type'] == 'initial_state'
+
+        owner.send_json({'action': 'card.create', 'data': {'title': 'moved'}})
+        card_id = owner.receive_json()['data']['id']
+
+        # Both moves land inside one coalescing window; the stranger's must not claim the card's pending move.
+        stranger.send_json({'action': 'card.move', 'data': {'id': card_id, 'column': 'done'}})
+        owner.send_json({'action': 'card.move', 'data': {'id': card_id, 'column': 'in_progress'}})
+
+        message = owner.receive_json()
+        assert message['type'] == 'card.moved'
+        assert message['data']['column'] == 'in_progress'
+    cards = client.get('/api/boards/1/cards', headers={'Authorization': f'Bearer {make_token()}'}).json()
+    assert [card['column'] for card in cards] == ['in_progress']
+
+
+def test_create_racing_the_snapshot_is_not_replayed(client, make_token, monkeypatch):
+    loading = threading.Event()
+    release = threading.Event()
+    list_cards = crud.list_cards
+
+    def stalled_list_cards(db, board_id):
+        loading.set()
+        release.wait(timeout=10)
+        return list_cards(db, board_id)
+
+    monkeypatch.setattr(crud, 'list_cards', stalled_list_cards)
+    headers = {'Authorization': f'Bearer {make_token()}'}
+
+    with client.websocket_connect(f'/ws/boards/1?token={make_token()}') as websocket:
+        # The snapshot's seq is taken; the card is created before the snapshot is read.
+        assert loading.wait(timeout=5)
+        created = client.post('/api/boards/1/cards', json={'title': 'racing'}, headers=headers).json()
+        release.set()
+
+        live = websocket.receive_json()
+        assert live['type'] == 'card.created'
+        initial = websocket.receive_json()
+        assert initial['type'] == 'initial_state'
+        assert [card['id'] for card in initial['data']] == [created['id']]
+
+        # Nothing is replayed after the snapshot, so the next frame answers this create.
+        websocket.send_json({'action': 'card.create', 'data': {'title': 'after'}})
+        message = websocket.receive_json()
+        assert message['type'] == 'card.created'
+        assert message['data']['title'] == 'after'
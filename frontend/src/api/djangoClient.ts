@@ -7,7 +7,9 @@ import type {
   Workspace,
   CreateWorkspaceData,
   Board,
-  CreateBoardData 
+  CreateBoardData,
+  BoardAccessGrant,
+  CursorPage
 } from './types';
 
 const DJANGO_API_URL = import.meta.env.VITE_DJANGO_API_URL || 'http://localhost:8000';
@@ -93,10 +95,19 @@ export const authAPI = {
   },
 };
 
+const listAll = async <T>(url: string, params: Record<string, unknown> = {}): Promise<T[]> => {
+  let response = await djangoClient.get<CursorPage<T>>(url, { params: { ...params, cursor: '' } });
+  const results = [...response.data.results];
+  while (response.data.next) {
+    response = await djangoClient.get<CursorPage<T>>(response.data.next);
+    results.push(...response.data.results);
+  }
+  return results;
+};
+
 export const workspaceAPI = {
   list: async (): Promise<Workspace[]> => {
-    const response = await djangoClient.get<Workspace[]>('/api/workspaces/');
-    return response.data;
+    return listAll<Workspace>('/api/workspaces/', { compact: 1 });
   },
 
   create: async (data: CreateWorkspaceData): Promise<Workspace> => {
@@ -132,8 +143,7 @@ export const workspaceAPI = {
 
 export const boardAPI = {
   list: async (workspaceId: number): Promise<Board[]> => {
-    const response = await djangoClient.get<Board[]>(`/api/workspaces/${workspaceId}/boards/`);
-    return response.data;
+    return listAll<Board>(`/api/workspaces/${workspaceId}/boards/`);
   },
 
   create: async (workspaceId: number, data: CreateBoardData): Promise<Board> => {
@@ -157,6 +167,11 @@ export const boardAPI = {
   delete: async (id: number): Promise<void> => {
     await djangoClient.delete(`/api/boards/${id}/`);
   },
+
+  access: async (id: number): Promise<BoardAccessGrant> => {
+    const response = await djangoClient.post<BoardAccessGrant>(`/api/boards/${id}/access/`);
+    return response.data;
+  },
 };
 
 export default djangoClient;
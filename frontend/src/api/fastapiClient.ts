@@ -27,6 +27,24 @@ export const cardAPI = {
     return response.data;
   },
 
+  page: async (
+    boardId: number,
+    cursor?: string,
+    limit = 100
+  ): Promise<{ cards: Card[]; nextCursor: string | null }> => {
+    const response = await fastapiClient.get<Card[]>(`/api/boards/${boardId}/cards`, {
+      params: { limit, cursor },
+    });
+    return { cards: response.data, nextCursor: response.headers['x-next-cursor'] ?? null };
+  },
+
+  search: async (boardId: number, q: string, limit = 20): Promise<Card[]> => {
+    const response = await fastapiClient.get<Card[]>(`/api/boards/${boardId}/cards/search`, {
+      params: { q, limit },
+    });
+    return response.data;
+  },
+
   create: async (boardId: number, data: CreateCardData): Promise<Card> => {
     const response = await fastapiClient.post<Card>(`/api/boards/${boardId}/cards`, data);
     return response.data;
@@ -25,12 +25,18 @@ export interface RegisterData {
   last_name?: string;
 }
 
+export interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
 export interface Workspace {
   id: number;
   name: string;
   description?: string;
   owner: User;
-  members: WorkspaceMember[];
+  members?: WorkspaceMember[];
   member_count: number;
   created_at: string;
   updated_at: string;
@@ -63,6 +69,14 @@ export interface CreateBoardData {
   description?: string;
 }
 
+export interface BoardAccessGrant {
+  grant: string;
+  expires_in: number;
+  board_id: number;
+  workspace_id: number;
+  role: 'owner' | 'admin' | 'member';
+}
+
 export interface Card {
   id: number;
   board_id: number;
@@ -70,6 +84,7 @@ export interface Card {
   description?: string;
   column: 'todo' | 'in_progress' | 'done';
   position: number;
+  rank: string;
   created_by: number;
   created_at: string;
   updated_at: string;
@@ -87,6 +102,8 @@ export interface CreateCardData {
   description?: string;
   column?: 'todo' | 'in_progress' | 'done';
   position?: number;
+  after_id?: number;
+  before_id?: number;
 }
 
 export interface UpdateCardData {
@@ -94,18 +111,48 @@ export interface UpdateCardData {
   description?: string;
   column?: 'todo' | 'in_progress' | 'done';
   position?: number;
+  after_id?: number;
+  before_id?: number;
+}
+
+export interface CardPosition {
+  id: number;
+  board_id: number;
+  column?: Card['column'];
+  position?: number;
+}
+
+export interface RateLimited {
+  action: WSAction['action'] | 'unknown';
+  scope: 'connection' | 'user' | 'board';
+  // null when the action costs more than the bucket holds and will never be admitted.
+  retry_after: number | null;
+  cost: number;
+  rate: number;
+  burst: number;
 }
 
 export interface WSMessage {
-  type: 'card.created' | 'card.updated' | 'card.moved' | 'card.deleted' | 'initial_state';
-  data: Card | Card[] | { id: number; board_id: number };
+  type:
+    | 'card.created'
+    | 'card.updated'
+    | 'card.moved'
+    | 'card.moving'
+    | 'card.deleted'
+    | 'initial_state'
+    | 'resync'
+    | 'batch'
+    | 'ping'
+    | 'rate_limited';
+  data: Card | Card[] | { id: number; board_id: number } | CardPosition | WSMessage[] | RateLimited;
+  seq?: number;
   user?: {
     user_id: number;
     username: string;
   };
 }
 
-export interface WSAction {
+export interface WSCardAction {
   action: 'card.create' | 'card.update' | 'card.move' | 'card.delete';
   data: {
     id?: number;
@@ -113,5 +160,18 @@ export interface WSAction {
     description?: string;
     column?: 'todo' | 'in_progress' | 'done';
     position?: number;
+    after_id?: number;
+    before_id?: number;
   };
 }
+
+export interface WSBatchAction {
+  action: 'batch';
+  data: WSCardAction[];
+}
+
+export interface WSPongAction {
+  action: 'pong';
+}
+
+export type WSAction = WSCardAction | WSBatchAction | WSPongAction;
@@ -0,0 +1,88 @@
+import { decode, encode } from '@msgpack/msgpack';
+import type { Card, WSAction, WSMessage } from './types';
+
+// Must match MSGPACK_SUBPROTOCOL and the code tables in the FastAPI service's app/encoding.py.
+export const MSGPACK_SUBPROTOCOL = 'collaboration-board.v1.msgpack';
+
+const MESSAGE_TYPES = [
+  'card.created',
+  'card.updated',
+  'card.moved',
+  'card.moving',
+  'card.deleted',
+  'initial_state',
+  'resync',
+  'batch',
+  'error',
+  'ping',
+  'rate_limited',
+] as const;
+const ACTIONS = ['card.create', 'card.update', 'card.move', 'card.delete', 'batch', 'pong'] as const;
+const COLUMNS: Card['column'][] = ['todo', 'in_progress', 'done'];
+
+type CardRow = [
+  number, number, string, string | null, number | string, number, string,
+  number, number, number, [number, number, number][],
+];
+
+interface PackedMessage {
+  type: number | string;
+  data: unknown;
+  seq?: number;
+  user?: WSMessage['user'];
+}
+
+const toIso = (millis: number) => new Date(millis).toISOString();
+
+const columnName = (column: number | string) =>
+  (typeof column === 'number' ? COLUMNS[column] : column) as Card['column'];
+
+const expandCard = (row: CardRow): Card => ({
+  id: row[0],
+  board_id: row[1],
+  title: row[2],
+  description: row[3] ?? undefined,
+  column: columnName(row[4]),
+  position: row[5],
+  rank: row[6],
+  created_by: row[7],
+  created_at: toIso(row[8]),
+  updated_at: toIso(row[9]),
+  assigned_to: row[10].map(([id, user_id, assigned_at]) => ({ id, user_id, assigned_at: toIso(assigned_at) })),
+});
+
+const expandMessage = (packed: PackedMessage): WSMessage => {
+  const type = (typeof packed.type === 'number' ? MESSAGE_TYPES[packed.type] : packed.type) as WSMessage['type'];
+  let data: unknown = packed.data;
+  if (type === 'resync' || type === 'batch') {
+    data = (packed.data as PackedMessage[]).map(expandMessage);
+  } else if (type === 'initial_state') {
+    data = (packed.data as CardRow[]).map(expandCard);
+  } else if (Array.isArray(packed.data)) {
+    data = expandCard(packed.data as CardRow);
+  } else if (packed.data && typeof packed.data === 'object' && 'column' in packed.data) {
+    const partial = packed.data as { column: number | string };
+    data = { ...partial, column: columnName(partial.column) };
+  }
+  return { ...packed, type, data: data as WSMessage['data'] };
+};
+
+export const decodeMessage = (buffer: ArrayBuffer): WSMessage =>
+  expandMessage(decode(new Uint8Array(buffer)) as PackedMessage);
+
+const packAction = (action: WSAction): Record<string, unknown> => {
+  const code = ACTIONS.indexOf(action.action);
+  if (action.action === 'pong') {
+    return { action: code };
+  }
+  if (action.action === 'batch') {
+    return { action: code, data: action.data.map(packAction) };
+  }
+  const { column, ...rest } = action.data;
+  return {
+    action: code,
+    data: column === undefined ? rest : { ...rest, column: COLUMNS.indexOf(column) },
+  };
+};
+
+export const encodeAction = (action: WSAction): Uint8Array => encode(packAction(action));
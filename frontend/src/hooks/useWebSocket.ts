@@ -1,7 +1,16 @@
 import { useEffect, useRef, useState, useCallback } from 'react';
-import type { Card, WSMessage, WSAction } from '@/api/types';
+import { boardAPI } from '@/api/djangoClient';
+import type { Card, CardPosition, RateLimited, WSMessage, WSAction } from '@/api/types';
+import { MSGPACK_SUBPROTOCOL, decodeMessage, encodeAction } from '@/api/wsCodec';
 
 const WS_URL = import.meta.env.VITE_WS_URL || 'ws://localhost:8001';
+// 'msgpack' offers the binary subprotocol; the server falls back to JSON if it does not accept it.
+const WS_PROTOCOLS = import.meta.env.VITE_WS_PROTOCOL === 'msgpack' ? [MSGPACK_SUBPROTOCOL] : [];
+const RESYNC_CLOSE_CODE = 4000;
+const ACCESS_REVOKED_CLOSE_CODE = 4003;
+
+const send = (ws: WebSocket, action: WSAction) =>
+  ws.send(ws.protocol === MSGPACK_SUBPROTOCOL ? encodeAction(action) : JSON.stringify(action));
 
 interface UseWebSocketOptions {
   boardId: number;
@@ -10,6 +19,7 @@ interface UseWebSocketOptions {
   onCardCreated?: (card: Card) => void;
   onCardUpdated?: (card: Card) => void;
   onCardMoved?: (card: Card) => void;
+  onCardMoving?: (position: CardPosition) => void;
   onCardDeleted?: (data: { id: number; board_id: number }) => void;
 }
 
@@ -20,6 +30,7 @@ export const useWebSocket = ({
   onCardCreated,
   onCardUpdated,
   onCardMoved,
+  onCardMoving,
   onCardDeleted,
 }: UseWebSocketOptions) => {
   const [isConnected, setIsConnected] = useState(false);
@@ -27,17 +38,37 @@ export const useWebSocket = ({
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null);
   const reconnectAttemptsRef = useRef(0);
+  const lastSeqRef = useRef<number | null>(null);
+  const activeRef = useRef(false);
   const maxReconnectAttempts = 5;
 
-  const connect = useCallback(() => {
+  const connect = useCallback(async () => {
     const token = localStorage.getItem('access_token');
     if (!token) {
       setConnectionError('No authentication token');
       return;
     }
 
+    // Grants are short-lived, so every (re)connect fetches a fresh one.
+    let grant: string;
     try {
-      const ws = new WebSocket(`${WS_URL}/ws/boards/${boardId}?token=${token}`);
+      ({ grant } = await boardAPI.access(boardId));
+    } catch (error) {
+      console.error('Error fetching board access grant:', error);
+      setConnectionError('Board access denied');
+      return;
+    }
+    if (!activeRef.current) {
+      return;
+    }
+
+    try {
+      const since = lastSeqRef.current !== null ? `&since=${lastSeqRef.current}` : '';
+      const ws = new WebSocket(
+        `${WS_URL}/ws/boards/${boardId}?token=${token}&grant=${encodeURIComponent(grant)}${since}`,
+        WS_PROTOCOLS
+      );
+      ws.binaryType = 'arraybuffer';
       wsRef.current = ws;
 
       ws.onopen = () => {
@@ -46,41 +77,69 @@ export const useWebSocket = ({
         reconnectAttemptsRef.current = 0;
       };
 
-      ws.onmessage = (event) => {
-        try {
-          const message: WSMessage = JSON.parse(event.data);
+      const handleMessage = (message: WSMessage) => {
+        if (onMessage) {
+          onMessage(message);
+        }
 
-          if (onMessage) {
-            onMessage(message);
+        if (message.seq !== undefined) {
+          const isSync = message.type === 'initial_state' || message.type === 'resync';
+          if (isSync || lastSeqRef.current === null || message.seq > lastSeqRef.current) {
+            lastSeqRef.current = message.seq;
           }
+        }
 
-          switch (message.type) {
-            case 'initial_state':
-              if (onInitialState && Array.isArray(message.data)) {
-                onInitialState(message.data as Card[]);
-              }
-              break;
-            case 'card.created':
-              if (onCardCreated && !Array.isArray(message.data)) {
-                onCardCreated(message.data as Card);
-              }
-              break;
-            case 'card.updated':
-              if (onCardUpdated && !Array.isArray(message.data)) {
-                onCardUpdated(message.data as Card);
-              }
-              break;
-            case 'card.moved':
-              if (onCardMoved && !Array.isArray(message.data)) {
-                onCardMoved(message.data as Card);
-              }
-              break;
-            case 'card.deleted':
-              if (onCardDeleted && !Array.isArray(message.data)) {
-                onCardDeleted(message.data as { id: number; board_id: number });
-              }
-              break;
-          }
+        switch (message.type) {
+          case 'initial_state':
+            if (onInitialState && Array.isArray(message.data)) {
+              onInitialState(message.data as Card[]);
+            }
+            break;
+          case 'card.created':
+            if (onCardCreated && !Array.isArray(message.data)) {
+              onCardCreated(message.data as Card);
+            }
+            break;
+          case 'card.updated':
+            if (onCardUpdated && !Array.isArray(message.data)) {
+              onCardUpdated(message.data as Card);
+            }
+            break;
+          case 'card.moved':
+            if (onCardMoved && !Array.isArray(message.data)) {
+              onCardMoved(message.data as Card);
+            }
+            break;
+          case 'card.moving':
+            if (onCardMoving && !Array.isArray(message.data)) {
+              onCardMoving(message.data as CardPosition);
+            }
+            break;
+          case 'card.deleted':
+            if (onCardDeleted && !Array.isArray(message.data)) {
+              onCardDeleted(message.data as { id: number; board_id: number });
+            }
+            break;
+          case 'resync':
+          case 'batch':
+            (message.data as WSMessage[]).forEach(handleMessage);
+            break;
+          case 'ping':
+            // The server drops connections that stay silent through its heartbeat timeout.
+            send(ws, { action: 'pong' });
+            break;
+          case 'rate_limited':
+            // The action was dropped; the board state is unchanged.
+            console.warn('WebSocket action rate limited:', message.data as RateLimited);
+            break;
+        }
+      };
+
+      ws.onmessage = (event) => {
+        try {
+          handleMessage(
+            ws.protocol === MSGPACK_SUBPROTOCOL ? decodeMessage(event.data) : JSON.parse(event.data)
+          );
         } catch (error) {
           console.error('Error parsing WebSocket message:', error);
         }
@@ -91,10 +150,23 @@ export const useWebSocket = ({
         setConnectionError('WebSocket connection error');
       };
 
-      ws.onclose = () => {
+      ws.onclose = (event) => {
         setIsConnected(false);
         wsRef.current = null;
 
+        if (event.code === RESYNC_CLOSE_CODE) {
+          lastSeqRef.current = null;
+        }
+
+        if (event.code === ACCESS_REVOKED_CLOSE_CODE) {
+          setConnectionError('Board access revoked');
+          return;
+        }
+
+        if (!activeRef.current) {
+          return;
+        }
+
         if (reconnectAttemptsRef.current < maxReconnectAttempts) {
           const delay = Math.min(1000 * 2 ** reconnectAttemptsRef.current, 30000);
           reconnectTimeoutRef.current = setTimeout(() => {
@@ -109,9 +181,10 @@ export const useWebSocket = ({
       console.error('Error creating WebSocket:', error);
       setConnectionError('Failed to create WebSocket connection');
     }
-  }, [boardId, onMessage, onInitialState, onCardCreated, onCardUpdated, onCardMoved, onCardDeleted]);
+  }, [boardId, onMessage, onInitialState, onCardCreated, onCardUpdated, onCardMoved, onCardMoving, onCardDeleted]);
 
   const disconnect = useCallback(() => {
+    activeRef.current = false;
     if (reconnectTimeoutRef.current) {
       clearTimeout(reconnectTimeoutRef.current);
       reconnectTimeoutRef.current = null;
@@ -124,14 +197,20 @@ export const useWebSocket = ({
   }, []);
 
   const sendAction = useCallback((action: WSAction) => {
-    if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
-      wsRef.current.send(JSON.stringify(action));
+    const ws = wsRef.current;
+    if (ws && ws.readyState === WebSocket.OPEN) {
+      send(ws, action);
     } else {
       console.warn('WebSocket is not connected');
     }
   }, []);
 
   useEffect(() => {
+    lastSeqRef.current = null;
+  }, [boardId]);
+
+  useEffect(() => {
+    activeRef.current = true;
     connect();
     return () => {
       disconnect();
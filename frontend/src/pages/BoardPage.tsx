@@ -41,6 +41,9 @@ export const BoardPage = () => {
     onCardMoved: (card) => {
       setCards((prev) => prev.map((c) => (c.id === card.id ? card : c)));
     },
+    onCardMoving: (position) => {
+      setCards((prev) => prev.map((c) => (c.id === position.id ? { ...c, ...position } : c)));
+    },
     onCardDeleted: (data) => {
       setCards((prev) => prev.filter((c) => c.id !== data.id));
     },
@@ -80,7 +83,9 @@ export const BoardPage = () => {
   };
 
   const getCardsInColumn = (column: string) => {
-    return cards.filter((card) => card.column === column);
+    return cards
+      .filter((card) => card.column === column)
+      .sort((a, b) => (a.rank < b.rank ? -1 : a.rank > b.rank ? 1 : a.id - b.id));
   };
 
   const columns: { id: 'todo' | 'in_progress' | 'done'; title: string; color: string }[] = [